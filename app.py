@@ -1,25 +1,44 @@
 from __future__ import annotations
 
 import os
+import atexit
 import csv
 import io
+import itertools
+import queue
 import subprocess
 import threading
 import time
-import uuid
+import hmac
 import json
 import secrets
 import shutil
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import asdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Callable, List, Optional
 from urllib.parse import urlparse
 
 from flask import Flask, Response, jsonify, render_template, request, session
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 
 from archiver import ArchiveWebTool
 from db import MySQLStore, SQLiteStore
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+try:
+    import waitress
+except Exception:  # pragma: no cover
+    waitress = None
+
 
 BASE_DIR = Path(__file__).resolve().parent
 OUTPUT_DIR = BASE_DIR / "output"
@@ -37,12 +56,37 @@ MYSQL_USER = (os.environ.get("MYSQL_USER") or "root").strip()
 MYSQL_PASSWORD = (os.environ.get("MYSQL_PASSWORD") or "").strip()
 OUTPUT_ROOT_DIR = Path(os.environ.get("OUTPUT_ROOT_DIR", str(OUTPUT_DIR))).expanduser().resolve()
 OUTPUT_ROOT_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_ROOT_STR = str(OUTPUT_ROOT_DIR)
 ALLOW_UNSAFE_OUTPUT_ROOT = os.environ.get("ALLOW_UNSAFE_OUTPUT_ROOT", "0").strip().lower() in {"1", "true", "yes", "on"}
 
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs) -> str:
+        if not kwargs:
+            try:
+                option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+                return orjson.dumps(obj, option=option).decode("utf-8")
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+        return super().loads(s, **kwargs)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("APP_SECRET_KEY") or secrets.token_hex(32)
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+JINJA_CACHE_DIR = BASE_DIR / "runtime" / "jinja-cache"
+JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
 tool = ArchiveWebTool(timeout=60)
 if DB_BACKEND == "mysql":
     store = MySQLStore(
@@ -54,32 +98,20 @@ if DB_BACKEND == "mysql":
     )
 else:
     store = SQLiteStore(DB_PATH)
-JOBS: dict[str, dict] = {}
-JOBS_LOCK = threading.Lock()
-MISSING_JOBS: dict[str, dict] = {}
-MISSING_JOBS_LOCK = threading.Lock()
-INSPECT_JOBS: dict[str, dict] = {}
-INSPECT_JOBS_LOCK = threading.Lock()
-ANALYZE_JOBS: dict[str, dict] = {}
-ANALYZE_JOBS_LOCK = threading.Lock()
-ANALYZE_BATCH_JOBS: dict[str, dict] = {}
-ANALYZE_BATCH_JOBS_LOCK = threading.Lock()
-CHECK_JOBS: dict[str, dict] = {}
-CHECK_JOBS_LOCK = threading.Lock()
-SITEMAP_JOBS: dict[str, dict] = {}
-SITEMAP_JOBS_LOCK = threading.Lock()
 
 CACHE_TTL_SECONDS = 900
-INSPECT_CACHE: dict[str, tuple[float, dict]] = {}
-ANALYSIS_CACHE: dict[str, tuple[float, dict]] = {}
+PROGRESS_FLUSH_SECONDS = 0.1
+MEMORY_CACHE_MAX_ITEMS = int(os.environ.get("MEMORY_CACHE_MAX_ITEMS", "2048"))
 ANALYZE_DEEP_CDX_LIMIT = 12000
 PERSISTENT_CACHE_MAX_AGE_SECONDS = 315360000
 MAX_ACTIVE_JOBS = int(os.environ.get("MAX_ACTIVE_JOBS", "4"))
+BATCH_ANALYZE_WORKERS = int(os.environ.get("BATCH_ANALYZE_WORKERS", "4"))
+WSGI_THREADS = int(os.environ.get("WSGI_THREADS", "16"))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
 REQUIRE_LOCAL_MUTATIONS = (os.environ.get("REQUIRE_LOCAL_MUTATIONS", "1").strip().lower() in {"1", "true", "yes", "on"})
 APP_API_TOKEN = (os.environ.get("APP_API_TOKEN") or "").strip()
-ACTIVE_JOBS_LOCK = threading.Lock()
-ACTIVE_JOBS_COUNT = 0
 JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+MAX_RETAINED_JOBS = int(os.environ.get("MAX_RETAINED_JOBS", "500"))
 JOB_CLEANUP_INTERVAL_SECONDS = int(os.environ.get("JOB_CLEANUP_INTERVAL_SECONDS", "60"))
 _LAST_JOB_CLEANUP_TS = 0.0
 DB_PRUNE_INTERVAL_SECONDS = int(os.environ.get("DB_PRUNE_INTERVAL_SECONDS", "600"))
@@ -96,7 +128,7 @@ DEFAULT_APP_SETTINGS = {
     "theme_text": "#2d241c",
     "theme_muted": "#6b5b4d",
     "theme_border": "#e0d6c8",
-    "default_output_root": str(OUTPUT_ROOT_DIR),
+    "default_output_root": OUTPUT_ROOT_STR,
     "default_display_limit": 10,
     "default_inspect_cdx_limit": 1500,
     "default_analyze_cdx_limit": 12000,
@@ -111,49 +143,292 @@ class JobCapacityError(RuntimeError):
     pass
 
 
+class JobTable:
+    """Job records keyed by id. A stored record is never mutated: writers build a
+    new dict under that job's own lock and swap it in, so readers can use `get`
+    lock-free and writers to different jobs never contend. Every write stamps a
+    new `version`, which status responses use as ETag; records carry `"ok": True`
+    so a status poll can serialize them as they are, and `body` keeps the latest
+    serialization per job so repeated polls reuse it without locking. Per-state
+    counts are kept up to date on every write for diagnostics. Each job's lock is
+    a Condition, so a worker can sleep in `wait_for_change` until its record is
+    written again."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, dict] = {}
+        self._conds: dict[str, threading.Condition] = {}
+        self._bodies: dict[str, tuple[object, bytes]] = {}
+        self._table_lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self._counts: dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    @staticmethod
+    def _state_of(job: dict) -> str:
+        return str(job.get("state") or "unknown")
+
+    def _move_count(self, old_state: Optional[str], new_state: Optional[str]) -> None:
+        if old_state == new_state:
+            return
+        with self._counts_lock:
+            if old_state is not None:
+                value = self._counts.get(old_state, 0) - 1
+                if value > 0:
+                    self._counts[old_state] = value
+                else:
+                    self._counts.pop(old_state, None)
+            if new_state is not None:
+                self._counts[new_state] = self._counts.get(new_state, 0) + 1
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self._jobs.get(job_id)
+
+    def ids(self) -> list[str]:
+        return list(self._jobs)
+
+    def values(self) -> list[dict]:
+        return list(self._jobs.values())
+
+    def body(self, job_id: str, job: dict, serialize: Callable[[dict], bytes]) -> bytes:
+        cached = self._bodies.get(job_id)
+        if cached is not None and cached[0] == job.get("version"):
+            return cached[1]
+        body = serialize(job)
+        self._bodies[job_id] = (job.get("version"), body)
+        return body
+
+    def state_counts(self) -> dict[str, int]:
+        with self._counts_lock:
+            return dict(self._counts)
+
+    def create(self, job_id: str, record: dict) -> dict:
+        with self._table_lock:
+            cond = self._conds.setdefault(job_id, threading.Condition(threading.Lock()))
+        with cond:
+            record = {"ok": True, **record, "version": next(self._versions)}
+            previous = self._jobs.get(job_id)
+            self._jobs[job_id] = record
+            self._move_count(None if previous is None else self._state_of(previous), self._state_of(record))
+            cond.notify_all()
+        return record
+
+    def update(self, job_id: str, **fields: object) -> Optional[dict]:
+        return self.apply(job_id, lambda _job: fields)
+
+    def apply(self, job_id: str, change: Callable[[dict], Optional[dict]]) -> Optional[dict]:
+        cond = self._conds.get(job_id)
+        if cond is None:
+            return None
+        with cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            fields = change(job)
+            if fields:
+                old_state = self._state_of(job)
+                job = {**job, **fields, "version": next(self._versions)}
+                self._jobs[job_id] = job
+                self._move_count(old_state, self._state_of(job))
+                cond.notify_all()
+            return job
+
+    def wait_for_change(self, job_id: str, version: object, timeout: Optional[float]) -> Optional[dict]:
+        cond = self._conds.get(job_id)
+        if cond is None:
+            return None
+        with cond:
+            cond.wait_for(lambda: (self._jobs.get(job_id) or {}).get("version") != version, timeout)
+            return self._jobs.get(job_id)
+
+    def prune(self, predicate: Callable[[dict], bool]) -> int:
+        removed = 0
+        for job_id, job in list(self._jobs.items()):
+            if not predicate(job):
+                continue
+            cond = self._conds.get(job_id)
+            if cond is None:
+                continue
+            with cond:
+                job = self._jobs.get(job_id)
+                if job is None or not predicate(job):
+                    continue
+                del self._jobs[job_id]
+                self._move_count(self._state_of(job), None)
+                cond.notify_all()
+            with self._table_lock:
+                self._conds.pop(job_id, None)
+            self._bodies.pop(job_id, None)
+            removed += 1
+        return removed
+
+    def trim(self, limit: int, states: frozenset) -> int:
+        finished = [job for job in self.values() if job.get("state") in states]
+        excess = len(finished) - max(0, limit)
+        if excess <= 0:
+            return 0
+        finished.sort(key=lambda job: float(job.get("finished_at") or job.get("started_at") or 0))
+        oldest = {id(job) for job in finished[:excess]}
+        return self.prune(lambda job: id(job) in oldest)
+
+
+class SlotCounter:
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def try_acquire(self, cap: int) -> bool:
+        with self._lock:
+            if self._value >= cap:
+                return False
+            self._value += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._value > 0:
+                self._value -= 1
+
+
+class MemoryCache:
+    # LRU with a TTL. Keys look like "i|<target_url>|..."; entries are also
+    # indexed by target so per-project lookups and purges don't scan the cache.
+    def __init__(self, max_items: int, ttl_seconds: int) -> None:
+        self.max_items = max(1, max_items)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._by_target: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _target_of(key: str) -> str:
+        parts = key.split("|", 2)
+        return parts[1] if len(parts) >= 2 else ""
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        target = self._target_of(key)
+        keys = self._by_target.get(target)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                self._by_target.pop(target, None)
+
+    def get(self, key: str) -> Optional[tuple[float, dict]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if (time.time() - item[0]) > self.ttl_seconds:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return item
+
+    def set(self, key: str, data: dict) -> dict:
+        ts = time.time()
+        with self._lock:
+            self._entries[key] = (ts, data)
+            self._entries.move_to_end(key)
+            self._by_target.setdefault(self._target_of(key), {})[key] = ts
+            while len(self._entries) > self.max_items:
+                self._drop(next(iter(self._entries)))
+        return data
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def entries_for_target(self, target_url: str) -> list[tuple[str, float, dict]]:
+        now = time.time()
+        with self._lock:
+            out = []
+            for key in list(self._by_target.get(target_url, {})):
+                item = self._entries.get(key)
+                if item is None:
+                    continue
+                if (now - item[0]) > self.ttl_seconds:
+                    self._drop(key)
+                    continue
+                out.append((key, item[0], item[1]))
+            return out
+
+    def pop_target(self, target_url: str) -> int:
+        with self._lock:
+            keys = self._by_target.pop(target_url, {})
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_target.clear()
+
+
+ACTIVE_JOBS = SlotCounter()
+STORE_WRITES: queue.Queue = queue.Queue(maxsize=10000)
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, MAX_ACTIVE_JOBS), thread_name_prefix="job")
+JOB_FUTURES: dict[str, Future] = {}
+INSPECT_CACHE = MemoryCache(MEMORY_CACHE_MAX_ITEMS, CACHE_TTL_SECONDS)
+ANALYSIS_CACHE = MemoryCache(MEMORY_CACHE_MAX_ITEMS, CACHE_TTL_SECONDS)
+OUTPUT_CHOICES_CACHE = MemoryCache(32, 10)
+RECENT_ROWS_CACHE = MemoryCache(8, 3)
+JOBS = JobTable()
+MISSING_JOBS = JobTable()
+INSPECT_JOBS = JobTable()
+ANALYZE_JOBS = JobTable()
+ANALYZE_BATCH_JOBS = JobTable()
+CHECK_JOBS = JobTable()
+SITEMAP_JOBS = JobTable()
+
+
+def _new_job_id() -> str:
+    return secrets.token_hex(16)
+
+
 def _with_cache_meta(payload: dict, source: str, age_seconds: int) -> dict:
-    out = dict(payload or {})
-    out["_cache"] = {
-        "source": source,
-        "age_seconds": max(0, int(age_seconds)),
+    return {
+        **(payload or {}),
+        "_cache": {
+            "source": source,
+            "age_seconds": max(0, int(age_seconds)),
+        },
     }
-    return out
 
 
-def _cache_get(cache: dict[str, tuple[float, dict]], key: str) -> Optional[dict]:
+def _cache_get(cache: MemoryCache, key: str) -> Optional[dict]:
     item = cache.get(key)
     if not item:
         return None
-    ts, data = item
-    if (time.time() - ts) > CACHE_TTL_SECONDS:
-        cache.pop(key, None)
-        return None
-    return data
+    return item[1]
 
 
-def _cache_set(cache: dict[str, tuple[float, dict]], key: str, data: dict) -> dict:
-    cache[key] = (time.time(), data)
-    return data
+def _cache_set(cache: MemoryCache, key: str, data: dict) -> dict:
+    return cache.set(key, data)
 
 
-def _purge_memory_cache_for_target(target_url: str) -> None:
-    target_url = _normalize_target_url(target_url)
-    target_host = urlparse(target_url).netloc
+def _memoized(cache: MemoryCache, key: str, build: Callable[[], object]):
+    item = cache.get(key)
+    if item is not None:
+        return item[1]
+    return cache.set(key, build())
 
-    def _same_host(key_target: str) -> bool:
-        if not key_target:
-            return False
-        key_host = urlparse(_normalize_target_url(key_target)).netloc
-        return key_host == target_host
 
-    for key in list(INSPECT_CACHE.keys()):
-        parts = key.split("|", 3)
-        if len(parts) >= 2 and _same_host(parts[1]):
-            INSPECT_CACHE.pop(key, None)
-    for key in list(ANALYSIS_CACHE.keys()):
-        parts = key.split("|", 4)
-        if len(parts) >= 2 and _same_host(parts[1]):
-            ANALYSIS_CACHE.pop(key, None)
+def _invalidate_render_caches() -> None:
+    OUTPUT_CHOICES_CACHE.clear()
+    RECENT_ROWS_CACHE.clear()
+
+
+def _purge_memory_cache_for_target(target_url: str) -> None:
+    target_url = _normalize_target_url(target_url)
+    if not target_url:
+        return
+    INSPECT_CACHE.pop_target(target_url)
+    ANALYSIS_CACHE.pop_target(target_url)
 
 
 def _delete_project_output_dirs(target_url: str) -> Dict[str, object]:
@@ -216,6 +491,7 @@ def _project_output_delete_plan(target_url: str) -> Dict[str, List[str]]:
     return {"deletable": _uniq(deletable), "skipped": _uniq(skipped), "invalid": _uniq(invalid)}
 
 
+@lru_cache(maxsize=4096)
 def _normalize_target_url(target_url: str) -> str:
     raw = (target_url or "").strip()
     if not raw:
@@ -229,6 +505,11 @@ def _normalize_target_url(target_url: str) -> str:
     return f"https://{host}"
 
 
+@lru_cache(maxsize=4096)
+def _host_of(target_url: str) -> str:
+    return urlparse(target_url).netloc
+
+
 def _get_csrf_token() -> str:
     token = session.get("csrf_token")
     if not token:
@@ -242,46 +523,137 @@ def _is_local_request() -> bool:
     return addr in {"127.0.0.1", "::1", "localhost"}
 
 
+_FINISHED_STATES = frozenset({"done", "error"})
+_TERMINAL_STATES = frozenset({"done", "error", "stopped", "cancelled"})
+_MUTATION_SUFFIXES = ("/start", "/pause", "/resume", "/stop")
+
+
+_INDEX_DEFAULTS = {
+    "result": None,
+    "inspect": None,
+    "analysis": None,
+    "check": None,
+    "sitemap": None,
+    "error": None,
+    "action_message": None,
+    "download_job_id": None,
+    "rel_output": None,
+}
+
+
+def _render_index(**context):
+    return render_template("index.html", **{**_INDEX_DEFAULTS, **context})
+
+
+def _prefers_html() -> bool:
+    return request.accept_mimetypes.best_match(("text/html", "application/json")) == "text/html"
+
+
+def _form_error(message: str, status: int, **context):
+    if not _prefers_html():
+        return jsonify({"ok": False, "error": message}), status
+    return _render_index(error=message, **context), status
+
+
 def _security_error(message: str, status: int = 403):
-    if request.path.startswith("/api/") or request.path.endswith("/start") or request.path.endswith("/pause") or request.path.endswith("/resume") or request.path.endswith("/stop") or request.is_json:
+    path = request.path
+    if path.startswith("/api/") or path.endswith(_MUTATION_SUFFIXES) or request.is_json:
         return jsonify({"ok": False, "error": message}), status
-    return render_template("index.html", error=message, result=None, inspect=None, analysis=None, check=None), status
+    return _render_index(error=message), status
 
 
 def _claim_job_slot() -> None:
-    global ACTIVE_JOBS_COUNT
-    with ACTIVE_JOBS_LOCK:
-        if ACTIVE_JOBS_COUNT >= max(1, MAX_ACTIVE_JOBS):
-            raise JobCapacityError(f"Too many active jobs ({ACTIVE_JOBS_COUNT}/{MAX_ACTIVE_JOBS}). Wait for current jobs to finish.")
-        ACTIVE_JOBS_COUNT += 1
+    if not ACTIVE_JOBS.try_acquire(max(1, MAX_ACTIVE_JOBS)):
+        raise JobCapacityError(f"Too many active jobs ({ACTIVE_JOBS.value}/{MAX_ACTIVE_JOBS}). Wait for current jobs to finish.")
 
 
 def _release_job_slot() -> None:
-    global ACTIVE_JOBS_COUNT
-    with ACTIVE_JOBS_LOCK:
-        ACTIVE_JOBS_COUNT = max(0, ACTIVE_JOBS_COUNT - 1)
+    ACTIVE_JOBS.release()
+
+
+def _submit_job(job_id: str, runner: Callable[[], None]) -> None:
+    try:
+        future = JOB_EXECUTOR.submit(runner)
+    except RuntimeError:
+        _release_job_slot()
+        raise
+    JOB_FUTURES[job_id] = future
+    future.add_done_callback(lambda _future: JOB_FUTURES.pop(job_id, None))
+
+
+def _start_job(
+    jobs: JobTable,
+    runner: Callable[[str, float], None],
+    fields: Optional[dict] = None,
+    progress: Optional[dict] = None,
+) -> str:
+    _claim_job_slot()
+    job_id = _new_job_id()
+    started_at = time.monotonic()
+    jobs.create(
+        job_id,
+        {
+            "state": "queued",
+            "paused": False,
+            "cancelled": False,
+            "error": None,
+            "started_at": time.time(),
+            "started_monotonic": started_at,
+            **(fields or {}),
+            "progress": _queued_progress(started_at, **(progress or {})),
+            "result": None,
+        },
+    )
+
+    def _run() -> None:
+        try:
+            runner(job_id, started_at)
+        finally:
+            _release_job_slot()
+
+    _submit_job(job_id, _run)
+    return job_id
+
+
+def _cancel_queued_job(jobs: JobTable, job_id: str) -> bool:
+    future = JOB_FUTURES.get(job_id)
+    if future is None or not future.cancel():
+        return False
+    _release_job_slot()
+    job = jobs.get(job_id) or {}
+    _fail_job(jobs, job_id, float(job.get("started_monotonic") or time.monotonic()), "Stopped by user")
+    return True
+
+
+def _cancel_all_jobs() -> None:
+    def _cancel(job: dict) -> Optional[dict]:
+        if job.get("state") in _TERMINAL_STATES:
+            return None
+        return {"cancelled": True, "paused": False}
+
+    for jobs in (JOBS, MISSING_JOBS, INSPECT_JOBS, ANALYZE_JOBS, ANALYZE_BATCH_JOBS, CHECK_JOBS, SITEMAP_JOBS):
+        for job_id in jobs.ids():
+            jobs.apply(job_id, _cancel)
+
+
+def _shutdown_jobs() -> None:
+    _cancel_all_jobs()
+    JOB_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    _flush_store_writes()
 
 
 def _cleanup_old_jobs() -> None:
     now = time.time()
 
-    def _cleanup_map(job_map: dict[str, dict], lock: threading.Lock) -> None:
-        with lock:
-            for job_id, job in list(job_map.items()):
-                state = str(job.get("state") or "")
-                if state not in {"done", "error", "stopped", "cancelled"}:
-                    continue
-                started_at = float(job.get("started_at") or now)
-                if (now - started_at) > max(60, JOB_RETENTION_SECONDS):
-                    job_map.pop(job_id, None)
+    def _expired(job: dict) -> bool:
+        if job.get("state") not in _TERMINAL_STATES:
+            return False
+        finished_at = float(job.get("finished_at") or job.get("started_at") or now)
+        return (now - finished_at) > max(60, JOB_RETENTION_SECONDS)
 
-    _cleanup_map(JOBS, JOBS_LOCK)
-    _cleanup_map(MISSING_JOBS, MISSING_JOBS_LOCK)
-    _cleanup_map(INSPECT_JOBS, INSPECT_JOBS_LOCK)
-    _cleanup_map(ANALYZE_JOBS, ANALYZE_JOBS_LOCK)
-    _cleanup_map(ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK)
-    _cleanup_map(CHECK_JOBS, CHECK_JOBS_LOCK)
-    _cleanup_map(SITEMAP_JOBS, SITEMAP_JOBS_LOCK)
+    for jobs in (JOBS, MISSING_JOBS, INSPECT_JOBS, ANALYZE_JOBS, ANALYZE_BATCH_JOBS, CHECK_JOBS, SITEMAP_JOBS):
+        jobs.prune(_expired)
+        jobs.trim(MAX_RETAINED_JOBS, _TERMINAL_STATES)
 
 
 def _maybe_cleanup_jobs() -> None:
@@ -305,86 +677,233 @@ def _maybe_prune_db() -> None:
     _LAST_DB_PRUNE_TS = now
 
 
-def _job_status_response(job_id: str, job_map: dict[str, dict], lock: threading.Lock):
-    with lock:
-        job = job_map.get(job_id)
+def _maintenance_loop() -> None:
+    interval = max(5, min(JOB_CLEANUP_INTERVAL_SECONDS, DB_PRUNE_INTERVAL_SECONDS))
+    while True:
+        time.sleep(interval)
+        try:
+            _maybe_cleanup_jobs()
+        except Exception:
+            pass
+        _maybe_prune_db()
+
+
+def _write_behind(method: str, *args: object, **kwargs: object) -> None:
+    try:
+        STORE_WRITES.put_nowait((method, args, kwargs))
+    except queue.Full:
+        _drain_store_writes([(method, args, kwargs)])
+
+
+def _drain_store_writes(batch: list) -> None:
+    try:
+        with store.transaction():
+            for method, args, kwargs in batch:
+                getattr(store, method)(*args, **kwargs)
+    except Exception:
+        for method, args, kwargs in batch:
+            try:
+                getattr(store, method)(*args, **kwargs)
+            except Exception:
+                pass
+    _invalidate_render_caches()
+
+
+def _store_writer_loop() -> None:
+    while True:
+        batch = [STORE_WRITES.get()]
+        while len(batch) < 64:
+            try:
+                batch.append(STORE_WRITES.get_nowait())
+            except queue.Empty:
+                break
+        _drain_store_writes(batch)
+
+
+def _flush_store_writes() -> None:
+    batch = []
+    while True:
+        try:
+            batch.append(STORE_WRITES.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _drain_store_writes(batch)
+
+
+def _json_body(payload) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return app.json.dumps(payload).encode("utf-8")
+
+
+def _json_response(payload, status: int = 200) -> Response:
+    return Response(_json_body(payload), status=status, mimetype="application/json")
+
+
+_JOB_NOT_FOUND_BODY = _json_body({"ok": False, "error": "Job not found"})
+_JOB_FINISHED_BODY = _json_body({"ok": False, "error": "Job already finished"})
+_OK_BODY = _json_body({"ok": True})
+
+
+def _job_status_response(job_id: str, jobs: JobTable):
+    job = jobs.get(job_id)
     if not job:
-        return jsonify({"ok": False, "error": "Job not found"}), 404
-    return jsonify({"ok": True, **job})
+        return Response(_JOB_NOT_FOUND_BODY, status=404, mimetype="application/json")
+    etag = f"{job_id}-{job.get('version', 0)}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(jobs.body(job_id, job, _json_body), mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
-def _job_pause_response(job_id: str, job_map: dict[str, dict], lock: threading.Lock):
-    with lock:
-        job = job_map.get(job_id)
-        if not job:
-            return jsonify({"ok": False, "error": "Job not found"}), 404
-        if job.get("state") in ("done", "error"):
-            return jsonify({"ok": False, "error": "Job already finished"}), 400
-        job["paused"] = True
-        job["state"] = "paused"
-    return jsonify({"ok": True})
+def _job_events_response(job_id: str, jobs: JobTable):
+    job = jobs.get(job_id)
+    if not job:
+        return Response(_JOB_NOT_FOUND_BODY, status=404, mimetype="application/json")
 
+    def _stream():
+        current = job
+        while current is not None:
+            yield b"data: " + jobs.body(job_id, current, _json_body) + b"\n\n"
+            if current.get("state") in _FINISHED_STATES:
+                return
+            version = current.get("version")
+            current = jobs.wait_for_change(job_id, version, JOB_EVENTS_KEEPALIVE_SECONDS)
+            while current is not None and current.get("version") == version:
+                yield b": keepalive\n\n"
+                current = jobs.wait_for_change(job_id, version, JOB_EVENTS_KEEPALIVE_SECONDS)
 
-def _job_resume_response(job_id: str, job_map: dict[str, dict], lock: threading.Lock, on_resume=None):
-    with lock:
-        job = job_map.get(job_id)
-        if not job:
-            return jsonify({"ok": False, "error": "Job not found"}), 404
-        if job.get("state") in ("done", "error"):
-            return jsonify({"ok": False, "error": "Job already finished"}), 400
-        job["paused"] = False
+    response = Response(_stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _transition(jobs: JobTable, job_id: str, changes: Callable[[dict], dict]) -> Optional[dict]:
+    current = jobs.get(job_id)
+    if current is None or current.get("state") in _FINISHED_STATES or not changes(current):
+        return current
+
+    def _change(job: dict) -> Optional[dict]:
+        if job.get("state") in _FINISHED_STATES:
+            return None
+        return changes(job)
+
+    return jobs.apply(job_id, _change)
+
+
+def _transition_response(job: Optional[dict]):
+    if not job:
+        return Response(_JOB_NOT_FOUND_BODY, status=404, mimetype="application/json")
+    if job.get("state") in _FINISHED_STATES:
+        return Response(_JOB_FINISHED_BODY, status=400, mimetype="application/json")
+    return Response(_OK_BODY, mimetype="application/json")
+
+
+def _job_pause_response(job_id: str, jobs: JobTable):
+    def _pause(job: dict) -> Optional[dict]:
+        if job.get("paused", False):
+            return None
+        return {"paused": True, "state": "paused"}
+
+    return _transition_response(_transition(jobs, job_id, _pause))
+
+
+def _job_resume_response(job_id: str, jobs: JobTable):
+    def _resume(job: dict) -> Optional[dict]:
+        if not job.get("paused", False) and job.get("state") != "paused":
+            return None
+        changes: dict = {"paused": False}
         if job.get("state") == "paused":
-            job["state"] = "running"
-        if callable(on_resume):
-            on_resume(job)
-    return jsonify({"ok": True})
+            changes["state"] = "running"
+        return changes
 
+    return _transition_response(_transition(jobs, job_id, _resume))
 
-def _job_stop_response(job_id: str, job_map: dict[str, dict], lock: threading.Lock):
-    with lock:
-        job = job_map.get(job_id)
-        if not job:
-            return jsonify({"ok": False, "error": "Job not found"}), 404
-        if job.get("state") in ("done", "error"):
-            return jsonify({"ok": False, "error": "Job already finished"}), 400
-        job["cancelled"] = True
-        job["paused"] = False
-        job["state"] = "stopping"
-    return jsonify({"ok": True})
+
+def _job_stop_response(job_id: str, jobs: JobTable):
+    job = _transition(
+        jobs, job_id, lambda job: None if job.get("cancelled", False) else {"cancelled": True, "paused": False, "state": "stopping"}
+    )
+    if job and job.get("state") not in _FINISHED_STATES:
+        _cancel_queued_job(jobs, job_id)
+    return _transition_response(job)
+
+
+_MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+_EMPTY_JSON_BODY = MappingProxyType({})
+
+
+_JOB_CONTROL_HANDLERS = {
+    "pause": _job_pause_response,
+    "resume": _job_resume_response,
+    "stop": _job_stop_response,
+}
+
+
+def _make_job_control_view(handler, jobs: JobTable):
+    def view(job_id: str):
+        return handler(job_id, jobs)
+
+    return view
+
+
+for _kind, _jobs in (
+    ("inspect", INSPECT_JOBS),
+    ("analyze", ANALYZE_JOBS),
+    ("analyze-batch", ANALYZE_BATCH_JOBS),
+    ("check", CHECK_JOBS),
+    ("sitemap", SITEMAP_JOBS),
+    ("download", JOBS),
+    ("download-missing", MISSING_JOBS),
+):
+    for _action, _handler in _JOB_CONTROL_HANDLERS.items():
+        app.add_url_rule(
+            f"/{_kind}/{_action}/<job_id>",
+            endpoint=f"{_kind.replace('-', '_')}_{_action}",
+            view_func=_make_job_control_view(_handler, _jobs),
+            methods=["POST"],
+        )
 
 
 @app.before_request
 def apply_security_guards():
-    _maybe_cleanup_jobs()
-    _maybe_prune_db()
-    if app.config.get("TESTING"):
+    if request.method not in _MUTATING_METHODS or app.config.get("TESTING"):
         return None
-    _get_csrf_token()
 
-    if request.method not in {"POST", "PUT", "PATCH", "DELETE"}:
-        return None
-
-    if REQUIRE_LOCAL_MUTATIONS and not _is_local_request():
+    is_local = _is_local_request()
+    if REQUIRE_LOCAL_MUTATIONS and not is_local:
         return _security_error("This app allows write operations from localhost only.", 403)
 
-    if APP_API_TOKEN and not _is_local_request():
+    body = request.get_json(silent=True) if request.is_json else None
+    if not isinstance(body, dict):
+        body = _EMPTY_JSON_BODY
+
+    if APP_API_TOKEN and not is_local:
         sent_token = (
             request.headers.get("X-App-Token")
             or request.form.get("app_token")
-            or (request.get_json(silent=True) or {}).get("app_token")
+            or body.get("app_token")
             or ""
         ).strip()
-        if sent_token != APP_API_TOKEN:
+        if not hmac.compare_digest(sent_token.encode("utf-8"), APP_API_TOKEN.encode("utf-8")):
             return _security_error("Invalid app token.", 401)
 
     expected = str(session.get("csrf_token") or "")
     provided = (
         request.headers.get("X-CSRF-Token")
         or request.form.get("csrf_token")
-        or (request.get_json(silent=True) or {}).get("csrf_token")
+        or body.get("csrf_token")
         or ""
     )
-    if not expected or not provided or provided != expected:
+    if not expected or not provided or not hmac.compare_digest(str(provided).encode("utf-8"), expected.encode("utf-8")):
         return _security_error("Invalid CSRF token.", 403)
     return None
 
@@ -397,7 +916,12 @@ def inject_security_tokens():
 
 
 def _elapsed_seconds(started_at: float) -> int:
-    return max(0, int(time.time() - float(started_at or time.time())))
+    # `started_at` here is a time.monotonic() baseline, not the record's wall-clock started_at.
+    now = time.monotonic()
+    return max(0, int(now - float(started_at or now)))
+
+
+_PROGRESS_ITEM_KEYS = ("current_url", "current_variant", "current_snapshot", "label", "snapshot")
 
 
 def _normalize_progress(
@@ -408,17 +932,22 @@ def _normalize_progress(
     message: str = "Working",
     current_item: str = "",
 ) -> dict:
-    raw = dict(payload or {})
+    # Normalizes `payload` in place and returns it; callers pass a dict they own
+    # (tool callbacks build a fresh one per tick, stored progress is copied first).
+    raw = payload if payload is not None else {}
     pct = raw.get("percent", 0)
-    try:
-        percent = int(float(pct))
-    except (TypeError, ValueError):
-        percent = 0
-    percent = max(0, min(100, percent))
+    if type(pct) is int:
+        percent = pct
+    else:
+        try:
+            percent = int(float(pct))
+        except (TypeError, ValueError):
+            percent = 0
+    percent = 0 if percent < 0 else (100 if percent > 100 else percent)
 
     current = raw.get("current_item") or current_item
     if not current:
-        for key in ("current_url", "current_variant", "current_snapshot", "label", "snapshot"):
+        for key in _PROGRESS_ITEM_KEYS:
             value = raw.get(key)
             if value:
                 current = str(value)
@@ -432,6 +961,10 @@ def _normalize_progress(
     return raw
 
 
+_DONE_PROGRESS = MappingProxyType({"stage": "done", "percent": 100})
+_ERROR_PROGRESS = MappingProxyType({"stage": "error"})
+
+
 def _queued_progress(started_at: float, **extra: object) -> dict:
     base = {
         "stage": "queued",
@@ -443,38 +976,195 @@ def _queued_progress(started_at: float, **extra: object) -> dict:
     return _normalize_progress(base, started_at, stage="queued", message="Job queued")
 
 
+def _finish_job(jobs: JobTable, job_id: str, started_at: float, message: str, result: object) -> None:
+    def _progress(job: dict) -> dict:
+        progress = {**(job.get("progress") or {}), **_DONE_PROGRESS, "message": message}
+        return _normalize_progress(progress, started_at, stage="done", message=message)
+
+    seen = jobs.get(job_id) or {}
+    progress = _progress(seen)
+
+    def _done(job: dict) -> dict:
+        return {
+            "state": "done",
+            "progress": progress if job is seen else _progress(job),
+            "result": result,
+            "finished_at": time.time(),
+        }
+
+    jobs.apply(job_id, _done)
+    jobs.trim(MAX_RETAINED_JOBS, _TERMINAL_STATES)
+    _invalidate_render_caches()
+
+
+def _fail_job(jobs: JobTable, job_id: str, started_at: float, message: str) -> None:
+    def _progress(job: dict) -> dict:
+        progress = {**(job.get("progress") or {}), **_ERROR_PROGRESS, "message": message}
+        return _normalize_progress(progress, started_at, stage="error", message=message)
+
+    seen = jobs.get(job_id) or {}
+    progress = _progress(seen)
+
+    def _failed(job: dict) -> dict:
+        return {
+            "state": "error",
+            "error": message,
+            "progress": progress if job is seen else _progress(job),
+            "finished_at": time.time(),
+        }
+
+    jobs.apply(job_id, _failed)
+    jobs.trim(MAX_RETAINED_JOBS, _TERMINAL_STATES)
+    _invalidate_render_caches()
+
+
+class _ProgressUpdater:
+    """Progress callback for a job runner. Ticks arriving within
+    PROGRESS_FLUSH_SECONDS of the last write are held back and folded into the
+    next write (a one-shot timer flushes the tail); stage changes and completion
+    always go through."""
+
+    def __init__(self, jobs: JobTable, job_id: str, started_at: float, *, stage: str, message: str) -> None:
+        self._jobs = jobs
+        self._job_id = job_id
+        self._started_at = started_at
+        self._stage = stage
+        self._message = message
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._last_stage: object = None
+        self._pending: Optional[dict] = None
+        self._timer: Optional[threading.Timer] = None
+
+    def __call__(self, payload: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stage = payload.get("stage")
+            urgent = stage != self._last_stage or payload.get("percent") == 100
+            if not urgent and (now - self._last_write) < PROGRESS_FLUSH_SECONDS:
+                self._pending = payload
+                if self._timer is None:
+                    self._timer = threading.Timer(PROGRESS_FLUSH_SECONDS - (now - self._last_write), self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._pending = None
+            self._last_write = now
+            self._last_stage = stage
+            self._write(payload)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            payload, self._pending = self._pending, None
+            if payload is not None:
+                self._last_write = time.monotonic()
+                self._write(payload)
+
+    def _write(self, payload: dict) -> None:
+        progress = _normalize_progress(payload, self._started_at, stage=self._stage, message=self._message)
+
+        def _change(job: dict) -> Optional[dict]:
+            if job.get("state") in _TERMINAL_STATES:
+                return None
+            if job.get("paused", False):
+                return {"progress": progress}
+            return {"state": "running", "progress": progress}
+
+        self._jobs.apply(self._job_id, _change)
+
+
+def _abort_check(jobs: JobTable, job_id: str) -> Callable[[], bool]:
+    def _should_abort() -> bool:
+        job = jobs.get(job_id)
+        return job is None or bool(job.get("cancelled", False))
+
+    return _should_abort
+
+
+def _wait_while_paused(
+    jobs: JobTable,
+    job_id: str,
+    started_at: float,
+    item_key: str,
+    item: str,
+    before_pause: Optional[Callable[[], None]] = None,
+    resume_message: Optional[str] = None,
+) -> None:
+    def _resumed(job: dict) -> Optional[dict]:
+        if job.get("paused", False):
+            return None
+        changes = {"state": "running"} if job.get("state") == "paused" else {}
+        shown = job.get("progress") or {}
+        if resume_message and shown.get("message") == "Paused by user":
+            changes["progress"] = {**shown, "message": resume_message}
+        return changes or None
+
+    while True:
+        job = jobs.get(job_id)
+        if not job:
+            return
+        if bool(job.get("cancelled", False)):
+            raise RuntimeError("Stopped by user")
+        if not job.get("paused", False):
+            if _resumed(job):
+                jobs.apply(job_id, _resumed)
+            return
+        shown = job.get("progress") or {}
+        if shown.get("message") != "Paused by user" or shown.get("current_item") != item:
+            if before_pause is not None:
+                before_pause()
+                job = jobs.get(job_id) or job
+                shown = job.get("progress") or {}
+            progress = shown.copy()
+            progress["message"] = "Paused by user"
+            progress[item_key] = item
+            progress["current_item"] = item
+            progress = _normalize_progress(progress, started_at, stage="paused", message="Paused by user")
+            jobs.apply(job_id, lambda job: {"state": "paused", "progress": progress} if job.get("paused", False) else None)
+            continue
+        jobs.wait_for_change(job_id, job.get("version"), None)
+
+
+def _inspect_key(target_url: str, display_limit: int, cdx_limit: int) -> str:
+    return f"i|{target_url}|{display_limit}|{cdx_limit}"
+
+
+def _analyze_key(target_url: str, snapshot: str, cdx_limit: int) -> str:
+    return f"a|{target_url}|{snapshot}|{cdx_limit}"
+
+
+def _sitemap_key(target_url: str, snapshot: str) -> str:
+    return f"s|{target_url}|{snapshot}"
+
+
+def _check_key(target_url: str, snapshot: str) -> str:
+    return f"c|{target_url}|{snapshot}"
+
+
 def _cached_inspect(target_url: str, display_limit: int, cdx_limit: int) -> dict:
     target_url = _normalize_target_url(target_url)
-    key = f"i|{target_url}|{display_limit}|{cdx_limit}"
-    item = INSPECT_CACHE.get(key)
-    if item is not None:
-        ts, data = item
-        age = int(time.time() - ts)
-        if age <= CACHE_TTL_SECONDS:
-            return _with_cache_meta(data, "memory", age)
-        INSPECT_CACHE.pop(key, None)
-    got_db = store.get_inspect_cache_with_meta(key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
-    if got_db is not None:
-        payload = got_db["payload"]
-        _cache_set(INSPECT_CACHE, key, payload)
-        return _with_cache_meta(payload, "sqlite", int(got_db.get("age_seconds", 0)))
+    cached = _cached_inspect_only(target_url, display_limit, cdx_limit)
+    if cached is not None:
+        return cached
     data = tool.inspect(target_url, display_limit=display_limit, cdx_limit=cdx_limit)
-    store.set_inspect_cache(key, target_url, display_limit, cdx_limit, data)
-    store.upsert_project(target_url)
-    _cache_set(INSPECT_CACHE, key, data)
+    with store.transaction():
+        store.set_inspect_cache(_inspect_key(target_url, display_limit, cdx_limit), target_url, display_limit, cdx_limit, data)
+        store.upsert_project(target_url)
+    _cache_set(INSPECT_CACHE, _inspect_key(target_url, display_limit, cdx_limit), data)
     return _with_cache_meta(data, "archive", 0)
 
 
 def _cached_inspect_only(target_url: str, display_limit: int, cdx_limit: int) -> Optional[dict]:
     target_url = _normalize_target_url(target_url)
-    key = f"i|{target_url}|{display_limit}|{cdx_limit}"
+    key = _inspect_key(target_url, display_limit, cdx_limit)
     item = INSPECT_CACHE.get(key)
     if item is not None:
         ts, data = item
         age = int(time.time() - ts)
         if age <= CACHE_TTL_SECONDS:
             return _with_cache_meta(data, "memory", age)
-        INSPECT_CACHE.pop(key, None)
+        INSPECT_CACHE.pop(key)
     got_db = store.get_inspect_cache_with_meta(key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
     if got_db is not None:
         payload = got_db["payload"]
@@ -485,28 +1175,29 @@ def _cached_inspect_only(target_url: str, display_limit: int, cdx_limit: int) ->
 
 def _cached_analyze(target_url: str, selected_snapshot: str, cdx_limit: int = 12000) -> dict:
     target_url = _normalize_target_url(target_url)
-    key = f"a|{target_url}|{selected_snapshot}|{cdx_limit}"
+    key = _analyze_key(target_url, selected_snapshot, cdx_limit)
     item = ANALYSIS_CACHE.get(key)
     if item is not None:
         ts, data = item
         age = int(time.time() - ts)
         if age <= CACHE_TTL_SECONDS:
             return _with_cache_meta(data, "memory", age)
-        ANALYSIS_CACHE.pop(key, None)
+        ANALYSIS_CACHE.pop(key)
     got_db = store.get_analyze_cache_with_meta(key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
     if got_db is not None:
         payload = got_db["payload"]
         _cache_set(ANALYSIS_CACHE, key, payload)
         return _with_cache_meta(payload, "sqlite", int(got_db.get("age_seconds", 0)))
     data = tool.analyze(target_url, selected_snapshot, cdx_limit=cdx_limit)
-    store.set_analyze_cache(key, target_url, data.get("selected_snapshot", selected_snapshot), cdx_limit, data)
-    store.upsert_project(
-        target_url,
-        snapshot=data.get("selected_snapshot"),
-        site_type=data.get("site_type"),
-        estimated_files=int(data.get("estimated_files", 0) or 0),
-        estimated_size=int(data.get("estimated_size_bytes", 0) or 0),
-    )
+    with store.transaction():
+        store.set_analyze_cache(key, target_url, data.get("selected_snapshot", selected_snapshot), cdx_limit, data)
+        store.upsert_project(
+            target_url,
+            snapshot=data.get("selected_snapshot"),
+            site_type=data.get("site_type"),
+            estimated_files=int(data.get("estimated_files", 0) or 0),
+            estimated_size=int(data.get("estimated_size_bytes", 0) or 0),
+        )
     _cache_set(ANALYSIS_CACHE, key, data)
     return _with_cache_meta(data, "archive", 0)
 
@@ -525,11 +1216,7 @@ def _best_inspect_for_render(target_url: str, display_limit: Optional[int] = Non
     now = time.time()
     best_ts = 0.0
     best_payload: Optional[dict] = None
-    prefix = f"i|{target_url}|"
-    for key, item in INSPECT_CACHE.items():
-        if not key.startswith(prefix):
-            continue
-        ts, payload = item
+    for _key, ts, payload in INSPECT_CACHE.entries_for_target(target_url):
         if (now - ts) > CACHE_TTL_SECONDS:
             continue
         if ts > best_ts:
@@ -563,13 +1250,9 @@ def _best_analyze_for_render(target_url: str, selected_snapshot: str = "", cdx_l
     now = time.time()
     best_ts = 0.0
     best_payload: Optional[dict] = None
-    prefix = f"a|{target_url}|"
-    for key, item in ANALYSIS_CACHE.items():
-        if not key.startswith(prefix):
-            continue
+    for key, ts, payload in ANALYSIS_CACHE.entries_for_target(target_url):
         if selected_snapshot and f"|{selected_snapshot}|" not in key:
             continue
-        ts, payload = item
         if (now - ts) > CACHE_TTL_SECONDS:
             continue
         if ts > best_ts:
@@ -599,7 +1282,7 @@ def _best_sitemap_for_render(target_url: str, selected_snapshot: str = "") -> Op
         return None
 
     if selected_snapshot:
-        key = f"s|{target_url}|{selected_snapshot}"
+        key = _sitemap_key(target_url, selected_snapshot)
         row = store.get_sitemap_cache_with_meta(key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
         if row is not None:
             return _with_cache_meta(row.get("payload", {}), "sqlite", int(row.get("age_seconds", 0)))
@@ -616,7 +1299,7 @@ def _best_check_for_render(target_url: str, selected_snapshot: str = "") -> Opti
         return None
 
     if selected_snapshot:
-        key = f"c|{target_url}|{selected_snapshot}"
+        key = _check_key(target_url, selected_snapshot)
         row = store.get_check_cache_with_meta(key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
         if row is not None:
             return _with_cache_meta(row.get("payload", {}), "sqlite", int(row.get("age_seconds", 0)))
@@ -628,15 +1311,19 @@ def _best_check_for_render(target_url: str, selected_snapshot: str = "") -> Opti
 
 
 def _list_output_choices(current: str = "") -> list[str]:
-    choices: set[str] = {str(OUTPUT_ROOT_DIR)}
+    return _memoized(OUTPUT_CHOICES_CACHE, f"o|{current}", lambda: _scan_output_choices(current))
+
+
+def _scan_output_choices(current: str) -> list[str]:
+    choices: set[str] = {OUTPUT_ROOT_STR}
     if current:
         try:
             choices.add(str(_resolve_output_root(current)))
         except Exception:
-            choices.add(str(OUTPUT_ROOT_DIR))
+            choices.add(OUTPUT_ROOT_STR)
 
     try:
-        for manifest in OUTPUT_ROOT_DIR.glob("**/manifest.json"):
+        for manifest in tool._glob_manifests(OUTPUT_ROOT_DIR, "**"):
             choices.add(str(manifest.parent))
             choices.add(str(manifest.parent.parent))
     except Exception:
@@ -654,8 +1341,8 @@ def inject_template_defaults():
         current = ""
     return {
         "output_choices": _list_output_choices(current),
-        "recent_projects": store.list_recent_projects(limit=8),
-        "recent_jobs": store.list_recent_jobs(limit=10),
+        "recent_projects": _memoized(RECENT_ROWS_CACHE, "p|recent", lambda: store.list_recent_projects(limit=8)),
+        "recent_jobs": _memoized(RECENT_ROWS_CACHE, "j|recent", lambda: store.list_recent_jobs(limit=10)),
         "app_settings": _load_app_settings(),
     }
 
@@ -663,16 +1350,10 @@ def inject_template_defaults():
 @app.get("/")
 def index():
     settings = _load_app_settings()
-    return render_template(
-        "index.html",
-        result=None,
-        inspect=None,
-        analysis=None,
-        check=None,
+    return _render_index(
         selected_snapshot=None,
         target_url="",
         output_root=str(settings.get("default_output_root") or OUTPUT_ROOT_DIR),
-        error=None,
     )
 
 
@@ -833,12 +1514,8 @@ def settings_save():
         "theme_text": _safe_hex_color(request.form.get("theme_text", ""), current["theme_text"]),
         "theme_muted": _safe_hex_color(request.form.get("theme_muted", ""), current["theme_muted"]),
         "theme_border": _safe_hex_color(request.form.get("theme_border", ""), current["theme_border"]),
-        "default_output_root": str(request.form.get("default_output_root", str(OUTPUT_ROOT_DIR)).strip() or str(OUTPUT_ROOT_DIR)),
-        "default_display_limit": _parse_int(request.form.get("default_display_limit"), 10, 5, 2000),
-        "default_inspect_cdx_limit": _parse_int(request.form.get("default_inspect_cdx_limit"), 1500, 500, 100000),
-        "default_analyze_cdx_limit": _parse_int(request.form.get("default_analyze_cdx_limit"), 12000, 500, 100000),
-        "default_max_files": _parse_int(request.form.get("default_max_files"), 400, 50, 5000),
-        "default_missing_limit": _parse_int(request.form.get("default_missing_limit"), 300, 1, 5000),
+        "default_output_root": str(request.form.get("default_output_root", OUTPUT_ROOT_STR).strip() or OUTPUT_ROOT_STR),
+        **_parse_form_ints(request.form, _SETTINGS_FORM_INTS),
     }
     for key, value in updates.items():
         store.upsert_setting(key, value)
@@ -909,6 +1586,7 @@ def delete_recent_project():
 
     removed = store.delete_project(target_url, purge_related=purge_related)
     _purge_memory_cache_for_target(target_url)
+    _invalidate_render_caches()
     return jsonify(
         {
             "ok": True,
@@ -943,7 +1621,7 @@ def project_data_status():
     if not target_url:
         return jsonify({"ok": False, "error": "target_url is required"}), 400
     status = store.get_project_data_status(target_url)
-    return jsonify({"ok": True, "status": status})
+    return _json_response({"ok": True, "status": status})
 
 
 def _synth_inspect_from_analysis(target_url: str, analysis: dict) -> dict:
@@ -971,15 +1649,10 @@ def _synth_inspect_from_analysis(target_url: str, analysis: dict) -> dict:
 @app.get("/project/open")
 def open_project_cached():
     target_url = _normalize_target_url(request.args.get("target_url", "").strip())
-    output_root = request.args.get("output_root", str(OUTPUT_ROOT_DIR)).strip() or str(OUTPUT_ROOT_DIR)
+    output_root = request.args.get("output_root", OUTPUT_ROOT_STR).strip() or OUTPUT_ROOT_STR
     requested_snapshot = request.args.get("selected_snapshot", "").strip()
     if not target_url:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url="",
             output_root=output_root,
@@ -1010,22 +1683,14 @@ def open_project_cached():
         sitemap = _best_sitemap_for_render(target_url)
 
     if inspect is None and analysis is None:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
-            sitemap=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=target_url,
             output_root=output_root,
             error="No cached project data found yet. Run inspect first.",
         )
 
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
         check=check,
@@ -1033,34 +1698,28 @@ def open_project_cached():
         selected_snapshot=selected_snapshot,
         target_url=target_url,
         output_root=output_root,
-        error=None,
     )
 
 
 def _dir_size_bytes(path: Path) -> int:
     total = 0
-    try:
-        for root, _dirs, files in os.walk(path):
-            for name in files:
-                fp = Path(root) / name
-                try:
-                    total += int(fp.stat().st_size)
-                except Exception:
-                    pass
-    except Exception:
-        return 0
+    stack = [os.fspath(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
     return total
 
 
-def _jobs_state_counts(job_map: dict[str, dict], lock: threading.Lock) -> dict[str, int]:
-    counts: dict[str, int] = {}
-    with lock:
-        for job in job_map.values():
-            state = str(job.get("state") or "unknown")
-            counts[state] = counts.get(state, 0) + 1
-    return counts
-
-
 @app.get("/diagnostics")
 def diagnostics():
     payload = {
@@ -1070,19 +1729,19 @@ def diagnostics():
             "port": int(os.environ.get("PORT", "5000")),
             "max_active_jobs": MAX_ACTIVE_JOBS,
             "allow_unsafe_output_root": ALLOW_UNSAFE_OUTPUT_ROOT,
-            "output_root_dir": str(OUTPUT_ROOT_DIR),
+            "output_root_dir": OUTPUT_ROOT_STR,
             "require_local_mutations": REQUIRE_LOCAL_MUTATIONS,
         },
         "runtime": {
-            "active_jobs": ACTIVE_JOBS_COUNT,
+            "active_jobs": ACTIVE_JOBS.value,
             "jobs": {
-                "download": _jobs_state_counts(JOBS, JOBS_LOCK),
-                "missing": _jobs_state_counts(MISSING_JOBS, MISSING_JOBS_LOCK),
-                "inspect": _jobs_state_counts(INSPECT_JOBS, INSPECT_JOBS_LOCK),
-                "analyze": _jobs_state_counts(ANALYZE_JOBS, ANALYZE_JOBS_LOCK),
-                "analyze_batch": _jobs_state_counts(ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK),
-                "check": _jobs_state_counts(CHECK_JOBS, CHECK_JOBS_LOCK),
-                "sitemap": _jobs_state_counts(SITEMAP_JOBS, SITEMAP_JOBS_LOCK),
+                "download": JOBS.state_counts(),
+                "missing": MISSING_JOBS.state_counts(),
+                "inspect": INSPECT_JOBS.state_counts(),
+                "analyze": ANALYZE_JOBS.state_counts(),
+                "analyze_batch": ANALYZE_BATCH_JOBS.state_counts(),
+                "check": CHECK_JOBS.state_counts(),
+                "sitemap": SITEMAP_JOBS.state_counts(),
             },
         },
         "storage": {
@@ -1091,7 +1750,7 @@ def diagnostics():
             "output_size_bytes": _dir_size_bytes(OUTPUT_ROOT_DIR),
         },
     }
-    return jsonify(payload)
+    return _json_response(payload)
 
 
 def _parse_max_files(value: Optional[str]) -> int:
@@ -1129,6 +1788,38 @@ def _parse_int(value: Optional[str], default: int, min_value: int, max_value: in
     return max(min_value, min(num, max_value))
 
 
+_INSPECT_FORM_INTS = (("display_limit", 10, 5, 2000), ("cdx_limit", 1500, 500, 100000))
+_ANALYZE_FORM_INTS = (("display_limit", 10, 5, 2000), ("cdx_limit", ANALYZE_DEEP_CDX_LIMIT, 500, 100000))
+_ANALYZE_BATCH_FORM_INTS = (
+    ("display_limit", 20, 5, 500),
+    ("inspect_cdx_limit", 1500, 500, 100000),
+    ("analyze_cdx_limit", ANALYZE_DEEP_CDX_LIMIT, 500, 100000),
+    ("analyze_count", 100000, 1, 100000),
+)
+_SETTINGS_FORM_INTS = (
+    ("default_display_limit", 10, 5, 2000),
+    ("default_inspect_cdx_limit", 1500, 500, 100000),
+    ("default_analyze_cdx_limit", 12000, 500, 100000),
+    ("default_max_files", 400, 50, 5000),
+    ("default_missing_limit", 300, 1, 5000),
+)
+
+
+def _parse_form_ints(form, schema: tuple) -> dict[str, int]:
+    out: dict[str, int] = {}
+    get = form.get
+    for name, default, min_value, max_value in schema:
+        raw = get(name)
+        num = default
+        if raw:
+            try:
+                num = int(raw.strip())
+            except ValueError:
+                pass
+        out[name] = min_value if num < min_value else (max_value if num > max_value else num)
+    return out
+
+
 def _load_app_settings(force: bool = False) -> dict:
     global _APP_SETTINGS_CACHE, _APP_SETTINGS_CACHE_TS
     now = time.time()
@@ -1189,13 +1880,12 @@ def _resolve_output_root(value: Optional[str]) -> Path:
 
 def _manifest_preflight(target_url: str, selected_snapshot: str, output_root_input: str) -> dict:
     output_root = _resolve_output_root(output_root_input)
-    host = urlparse(target_url).netloc
-    host_slug = tool._safe_name(host)
+    host_slug = tool._safe_name(_host_of(target_url))
     snapshot = selected_snapshot.strip()
     exact_dir = output_root / f"{host_slug}_{snapshot}" if snapshot else None
-    selected_manifest = (exact_dir / "manifest.json") if exact_dir else None
+    selected_manifest = tool._find_manifest(exact_dir) if exact_dir else None
 
-    host_manifest_paths = sorted(output_root.glob(f"{host_slug}_*/manifest.json"))
+    host_manifest_paths = tool._glob_manifests(output_root, f"{host_slug}_*")
     available_snapshots: list[str] = []
     for path in host_manifest_paths:
         folder = path.parent.name
@@ -1205,12 +1895,8 @@ def _manifest_preflight(target_url: str, selected_snapshot: str, output_root_inp
             if snap:
                 available_snapshots.append(snap)
 
-    found_manifest = None
-    if selected_manifest and selected_manifest.exists():
-        found_manifest = selected_manifest
-    elif (output_root / "manifest.json").exists():
-        found_manifest = output_root / "manifest.json"
-    elif host_manifest_paths:
+    found_manifest = selected_manifest or tool._find_manifest(output_root)
+    if found_manifest is None and host_manifest_paths:
         if snapshot:
             exact_matches = [m for m in host_manifest_paths if m.parent.name == f"{host_slug}_{snapshot}"]
             if exact_matches:
@@ -1251,44 +1937,84 @@ def _build_sitemap_from_analysis(analysis: dict) -> dict:
 
     for page in pages:
         clean = str(page)
-        if not clean.startswith("/"):
+        if clean[:1] != "/":
             clean = "/" + clean
-        parts = [p for p in clean.split("/") if p]
-        key = "/" if not parts else f"/{parts[0]}/"
-        grouped.setdefault(key, []).append(clean)
+        head = clean.lstrip("/").partition("/")[0]
+        key = f"/{head}/" if head else "/"
+        items = grouped.get(key)
+        if items is None:
+            grouped[key] = [clean]
+        else:
+            items.append(clean)
 
-    groups = [
-        {
-            "folder": folder,
-            "count": len(items),
-            "pages": items[:50],
-        }
-        for folder, items in sorted(grouped.items(), key=lambda x: len(x[1]), reverse=True)
-    ]
+    groups = []
+    column_folders: list[str] = []
+    column_pages: list[str] = []
+    for folder, items in sorted(grouped.items(), key=lambda x: len(x[1]), reverse=True):
+        shown = items[:50]
+        groups.append({"folder": folder, "count": len(items), "pages": shown})
+        column_folders.extend([folder] * len(shown))
+        column_pages.extend(shown)
 
     return {
         "total_pages": len(pages),
         "pages": pages,
         "top_folders": folders,
         "groups": groups,
+        "columns": {"folder": column_folders, "page": column_pages},
     }
 
 
+def _sitemap_rows(sitemap: dict):
+    columns = sitemap.get("columns")
+    if columns:
+        return zip(columns.get("folder", []), columns.get("page", []))
+    return (
+        (group.get("folder", ""), page)
+        for group in sitemap.get("groups", [])
+        for page in group.get("pages", [])
+    )
+
+
+_SITEMAP_INFLIGHT: dict[str, threading.Event] = {}
+_SITEMAP_INFLIGHT_LOCK = threading.Lock()
+
+
+def _get_or_build_sitemap(target_url: str, analysis: dict) -> dict:
+    snapshot = analysis.get("selected_snapshot", "")
+    site_key = _sitemap_key(target_url, snapshot)
+    while True:
+        sitemap = store.get_sitemap_cache(site_key, CACHE_TTL_SECONDS)
+        if sitemap is not None:
+            return sitemap
+        with _SITEMAP_INFLIGHT_LOCK:
+            event = _SITEMAP_INFLIGHT.get(site_key)
+            leader = event is None
+            if leader:
+                event = _SITEMAP_INFLIGHT[site_key] = threading.Event()
+        if not leader:
+            event.wait()
+            continue
+        try:
+            sitemap = _build_sitemap_from_analysis(analysis)
+            store.set_sitemap_cache(site_key, target_url, snapshot, sitemap)
+            return sitemap
+        finally:
+            with _SITEMAP_INFLIGHT_LOCK:
+                _SITEMAP_INFLIGHT.pop(site_key, None)
+            event.set()
+
+
 @app.post("/inspect")
 def inspect_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
-    display_limit = _parse_int(request.form.get("display_limit"), default=10, min_value=5, max_value=2000)
-    cdx_limit = _parse_int(request.form.get("cdx_limit"), default=1500, min_value=500, max_value=100000)
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
+    limits = _parse_form_ints(request.form, _INSPECT_FORM_INTS)
+    display_limit, cdx_limit = limits["display_limit"], limits["cdx_limit"]
     try:
         inspect = _cached_inspect(target_url, display_limit, cdx_limit)
     except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=target_url,
             output_root=output_root,
@@ -1298,18 +2024,13 @@ def inspect_target():
         )
 
     selected_snapshot = inspect["latest_ok_snapshot"] if inspect["snapshots"] else None
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
-        analysis=None,
-        check=None,
         selected_snapshot=selected_snapshot,
         target_url=target_url,
         output_root=output_root,
         display_limit=display_limit,
         cdx_limit=cdx_limit,
-        error=None,
     )
 
 
@@ -1317,7 +2038,7 @@ def inspect_target():
 def inspect_start():
     settings = _load_app_settings()
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     display_limit = _parse_int(
         request.form.get("display_limit"),
         default=_get_setting_int(settings, "default_display_limit", 10, 5, 2000),
@@ -1340,10 +2061,11 @@ def inspect_start():
             cache_meta = cached.get("_cache", {}) if isinstance(cached, dict) else {}
             cache_source = str(cache_meta.get("source", "local"))
             cache_age = int(cache_meta.get("age_seconds", 0) or 0)
-            job_id = uuid.uuid4().hex
+            job_id = _new_job_id()
             started_at = time.time()
-            with INSPECT_JOBS_LOCK:
-                INSPECT_JOBS[job_id] = {
+            INSPECT_JOBS.create(
+                job_id,
+                {
                     "state": "done",
                     "paused": False,
                     "cancelled": False,
@@ -1365,9 +2087,10 @@ def inspect_start():
                         "total_ok": cached.get("total_ok_snapshots", 0),
                         "cache_source": cache_source,
                         "cache_age_seconds": cache_age,
-                    }, started_at, stage="done", message="Loaded from local cache"),
+                    }, time.monotonic(), stage="done", message="Loaded from local cache"),
                     "result": cached,
-                }
+                },
+            )
             return jsonify({"ok": True, "job_id": job_id, "cached": True})
 
     try:
@@ -1379,22 +2102,7 @@ def inspect_start():
 
 @app.get("/inspect/status/<job_id>")
 def inspect_status(job_id: str):
-    return _job_status_response(job_id, INSPECT_JOBS, INSPECT_JOBS_LOCK)
-
-
-@app.post("/inspect/pause/<job_id>")
-def inspect_pause(job_id: str):
-    return _job_pause_response(job_id, INSPECT_JOBS, INSPECT_JOBS_LOCK)
-
-
-@app.post("/inspect/resume/<job_id>")
-def inspect_resume(job_id: str):
-    return _job_resume_response(job_id, INSPECT_JOBS, INSPECT_JOBS_LOCK)
-
-
-@app.post("/inspect/stop/<job_id>")
-def inspect_stop(job_id: str):
-    return _job_stop_response(job_id, INSPECT_JOBS, INSPECT_JOBS_LOCK)
+    return _job_status_response(job_id, INSPECT_JOBS)
 
 
 @app.post("/analyze/start")
@@ -1402,7 +2110,7 @@ def analyze_start():
     settings = _load_app_settings()
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     display_limit = _parse_int(request.form.get("display_limit"), default=10, min_value=5, max_value=2000)
     cdx_limit = _parse_int(
         request.form.get("cdx_limit"),
@@ -1415,10 +2123,11 @@ def analyze_start():
 
     cached = _best_analyze_for_render(target_url, selected_snapshot=selected_snapshot, cdx_limit=cdx_limit)
     if cached is not None:
-        job_id = uuid.uuid4().hex
+        job_id = _new_job_id()
         started_at = time.time()
-        with ANALYZE_JOBS_LOCK:
-            ANALYZE_JOBS[job_id] = {
+        ANALYZE_JOBS.create(
+            job_id,
+            {
                 "state": "done",
                 "paused": False,
                 "cancelled": False,
@@ -1436,12 +2145,13 @@ def analyze_start():
                         "percent": 100,
                         "current_item": selected_snapshot,
                     },
-                    started_at,
+                    time.monotonic(),
                     stage="done",
                     message="Loaded analysis from local cache",
                 ),
                 "result": cached,
-            }
+            },
+        )
         return jsonify({"ok": True, "job_id": job_id, "cached": True})
 
     try:
@@ -1453,65 +2163,41 @@ def analyze_start():
 
 @app.get("/analyze/status/<job_id>")
 def analyze_status(job_id: str):
-    return _job_status_response(job_id, ANALYZE_JOBS, ANALYZE_JOBS_LOCK)
-
-
-@app.post("/analyze/pause/<job_id>")
-def analyze_pause(job_id: str):
-    return _job_pause_response(job_id, ANALYZE_JOBS, ANALYZE_JOBS_LOCK)
-
-
-@app.post("/analyze/resume/<job_id>")
-def analyze_resume(job_id: str):
-    return _job_resume_response(job_id, ANALYZE_JOBS, ANALYZE_JOBS_LOCK)
-
-
-@app.post("/analyze/stop/<job_id>")
-def analyze_stop(job_id: str):
-    return _job_stop_response(job_id, ANALYZE_JOBS, ANALYZE_JOBS_LOCK)
+    return _job_status_response(job_id, ANALYZE_JOBS)
 
 
 @app.get("/analyze/result/<job_id>")
 def analyze_result(job_id: str):
-    with ANALYZE_JOBS_LOCK:
-        job = ANALYZE_JOBS.get(job_id)
+    job = ANALYZE_JOBS.get(job_id)
     if not job or job.get("state") != "done" or not job.get("result"):
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=job.get("target_url", "") if job else "",
-            output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)) if job else str(OUTPUT_ROOT_DIR),
+            output_root=job.get("output_root", OUTPUT_ROOT_STR) if job else OUTPUT_ROOT_STR,
             error=(job.get("error") if job else "Analyze job not found") or "Analyze job not completed",
         )
     analysis = job["result"]
     disp = int(job.get("display_limit", 10))
     depth = int(job.get("cdx_limit", 1500))
     inspect = _best_inspect_for_render(job.get("target_url", ""), display_limit=disp, cdx_limit=depth)
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
-        check=None,
         selected_snapshot=analysis.get("selected_snapshot"),
         target_url=job.get("target_url", ""),
-        output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)),
-        error=None,
+        output_root=job.get("output_root", OUTPUT_ROOT_STR),
     )
 
 
 @app.post("/analyze-batch/start")
 def analyze_batch_start():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
-    display_limit = _parse_int(request.form.get("display_limit"), default=20, min_value=5, max_value=500)
-    inspect_cdx_limit = _parse_int(request.form.get("inspect_cdx_limit"), default=1500, min_value=500, max_value=100000)
-    analyze_cdx_limit = _parse_int(request.form.get("analyze_cdx_limit"), default=ANALYZE_DEEP_CDX_LIMIT, min_value=500, max_value=100000)
-    analyze_count = _parse_int(request.form.get("analyze_count"), default=100000, min_value=1, max_value=100000)
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
+    limits = _parse_form_ints(request.form, _ANALYZE_BATCH_FORM_INTS)
+    display_limit = limits["display_limit"]
+    inspect_cdx_limit = limits["inspect_cdx_limit"]
+    analyze_cdx_limit = limits["analyze_cdx_limit"]
+    analyze_count = limits["analyze_count"]
     if not target_url:
         return jsonify({"ok": False, "error": "URL is required"}), 400
     try:
@@ -1530,29 +2216,14 @@ def analyze_batch_start():
 
 @app.get("/analyze-batch/status/<job_id>")
 def analyze_batch_status(job_id: str):
-    return _job_status_response(job_id, ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK)
-
-
-@app.post("/analyze-batch/pause/<job_id>")
-def analyze_batch_pause(job_id: str):
-    return _job_pause_response(job_id, ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK)
-
-
-@app.post("/analyze-batch/resume/<job_id>")
-def analyze_batch_resume(job_id: str):
-    return _job_resume_response(job_id, ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK)
-
-
-@app.post("/analyze-batch/stop/<job_id>")
-def analyze_batch_stop(job_id: str):
-    return _job_stop_response(job_id, ANALYZE_BATCH_JOBS, ANALYZE_BATCH_JOBS_LOCK)
+    return _job_status_response(job_id, ANALYZE_BATCH_JOBS)
 
 
 @app.post("/check/start")
 def check_start():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     if not target_url:
         return jsonify({"ok": False, "error": "URL is required"}), 400
     try:
@@ -1577,7 +2248,7 @@ def check_start():
 def check_preflight():
     target_url = _normalize_target_url(request.args.get("target_url", "").strip())
     selected_snapshot = request.args.get("selected_snapshot", "").strip()
-    output_root = request.args.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root = request.args.get("output_root", OUTPUT_ROOT_STR).strip()
     if not target_url:
         return jsonify({"ok": False, "error": "URL is required"}), 400
     try:
@@ -1589,53 +2260,29 @@ def check_preflight():
 
 @app.get("/check/status/<job_id>")
 def check_status(job_id: str):
-    return _job_status_response(job_id, CHECK_JOBS, CHECK_JOBS_LOCK)
-
-
-@app.post("/check/pause/<job_id>")
-def check_pause(job_id: str):
-    return _job_pause_response(job_id, CHECK_JOBS, CHECK_JOBS_LOCK)
-
-
-@app.post("/check/resume/<job_id>")
-def check_resume(job_id: str):
-    return _job_resume_response(job_id, CHECK_JOBS, CHECK_JOBS_LOCK)
-
-
-@app.post("/check/stop/<job_id>")
-def check_stop(job_id: str):
-    return _job_stop_response(job_id, CHECK_JOBS, CHECK_JOBS_LOCK)
+    return _job_status_response(job_id, CHECK_JOBS)
 
 
 @app.get("/check/result/<job_id>")
 def check_result(job_id: str):
-    with CHECK_JOBS_LOCK:
-        job = CHECK_JOBS.get(job_id)
+    job = CHECK_JOBS.get(job_id)
     if not job or job.get("state") != "done" or not job.get("result"):
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=job.get("target_url", "") if job else "",
-            output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)) if job else str(OUTPUT_ROOT_DIR),
+            output_root=job.get("output_root", OUTPUT_ROOT_STR) if job else OUTPUT_ROOT_STR,
             error=(job.get("error") if job else "Check job not found") or "Check job not completed",
         )
     check = job["result"]
     inspect = _best_inspect_for_render(job.get("target_url", ""))
     analysis = _best_analyze_for_render(job.get("target_url", ""), selected_snapshot=job.get("selected_snapshot", ""))
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
         check=check,
         selected_snapshot=job.get("selected_snapshot", ""),
         target_url=job.get("target_url", ""),
-        output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)),
-        error=None,
+        output_root=job.get("output_root", OUTPUT_ROOT_STR),
     )
 
 
@@ -1643,7 +2290,7 @@ def check_result(job_id: str):
 def sitemap_start():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     cdx_limit = _parse_int(request.form.get("cdx_limit"), default=1500, min_value=500, max_value=100000)
     if not target_url:
         return jsonify({"ok": False, "error": "URL is required"}), 400
@@ -1656,38 +2303,17 @@ def sitemap_start():
 
 @app.get("/sitemap/status/<job_id>")
 def sitemap_status(job_id: str):
-    return _job_status_response(job_id, SITEMAP_JOBS, SITEMAP_JOBS_LOCK)
-
-
-@app.post("/sitemap/pause/<job_id>")
-def sitemap_pause(job_id: str):
-    return _job_pause_response(job_id, SITEMAP_JOBS, SITEMAP_JOBS_LOCK)
-
-
-@app.post("/sitemap/resume/<job_id>")
-def sitemap_resume(job_id: str):
-    return _job_resume_response(job_id, SITEMAP_JOBS, SITEMAP_JOBS_LOCK)
-
-
-@app.post("/sitemap/stop/<job_id>")
-def sitemap_stop(job_id: str):
-    return _job_stop_response(job_id, SITEMAP_JOBS, SITEMAP_JOBS_LOCK)
+    return _job_status_response(job_id, SITEMAP_JOBS)
 
 
 @app.get("/sitemap/result/<job_id>")
 def sitemap_result(job_id: str):
-    with SITEMAP_JOBS_LOCK:
-        job = SITEMAP_JOBS.get(job_id)
+    job = SITEMAP_JOBS.get(job_id)
     if not job or job.get("state") != "done" or not job.get("result"):
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=job.get("target_url", "") if job else "",
-            output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)) if job else str(OUTPUT_ROOT_DIR),
+            output_root=job.get("output_root", OUTPUT_ROOT_STR) if job else OUTPUT_ROOT_STR,
             error=(job.get("error") if job else "Sitemap job not found") or "Sitemap job not completed",
         )
     analysis = job["result"].get("analysis")
@@ -1695,47 +2321,32 @@ def sitemap_result(job_id: str):
     inspect = _best_inspect_for_render(job.get("target_url", ""))
     if analysis is None:
         analysis = _best_analyze_for_render(job.get("target_url", ""), selected_snapshot=job.get("selected_snapshot", ""))
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
-        check=None,
         sitemap=sitemap,
         selected_snapshot=job.get("selected_snapshot", ""),
         target_url=job.get("target_url", ""),
-        output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)),
-        error=None,
+        output_root=job.get("output_root", OUTPUT_ROOT_STR),
     )
 
 
 @app.get("/inspect/result/<job_id>")
 def inspect_result(job_id: str):
-    with INSPECT_JOBS_LOCK:
-        job = INSPECT_JOBS.get(job_id)
+    job = INSPECT_JOBS.get(job_id)
     if not job:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url="",
-            output_root=str(OUTPUT_ROOT_DIR),
+            output_root=OUTPUT_ROOT_STR,
             error="Inspect job not found",
         )
 
     if job.get("state") != "done" or not job.get("result"):
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=None,
             target_url=job.get("target_url", ""),
-            output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)),
+            output_root=job.get("output_root", OUTPUT_ROOT_STR),
             display_limit=job.get("display_limit", 120),
             cdx_limit=job.get("cdx_limit", 20000),
             error=job.get("error") or "Inspect job not completed yet",
@@ -1743,18 +2354,13 @@ def inspect_result(job_id: str):
 
     inspect = job["result"]
     selected_snapshot = inspect.get("latest_ok_snapshot") if inspect.get("snapshots") else None
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
-        analysis=None,
-        check=None,
         selected_snapshot=selected_snapshot,
         target_url=job.get("target_url", ""),
-        output_root=job.get("output_root", str(OUTPUT_ROOT_DIR)),
+        output_root=job.get("output_root", OUTPUT_ROOT_STR),
         display_limit=job.get("display_limit", 120),
         cdx_limit=job.get("cdx_limit", 20000),
-        error=None,
     )
 
 
@@ -1762,22 +2368,17 @@ def inspect_result(job_id: str):
 def analyze_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
-    display_limit = _parse_int(request.form.get("display_limit"), default=10, min_value=5, max_value=2000)
-    cdx_limit = _parse_int(request.form.get("cdx_limit"), default=ANALYZE_DEEP_CDX_LIMIT, min_value=500, max_value=100000)
+    output_root = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
+    limits = _parse_form_ints(request.form, _ANALYZE_FORM_INTS)
+    display_limit, cdx_limit = limits["display_limit"], limits["cdx_limit"]
 
     try:
-        inspect = _cache_get(INSPECT_CACHE, f"i|{target_url}|{display_limit}|{cdx_limit}")
+        inspect = _cache_get(INSPECT_CACHE, _inspect_key(target_url, display_limit, cdx_limit))
         if inspect is None:
             inspect = _cached_inspect(target_url, display_limit, cdx_limit)
         analysis = _cached_analyze(target_url, selected_snapshot, cdx_limit=cdx_limit)
     except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=selected_snapshot or None,
             target_url=target_url,
             output_root=output_root,
@@ -1786,18 +2387,14 @@ def analyze_target():
             error=str(exc),
         )
 
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
-        check=None,
         selected_snapshot=selected_snapshot,
         target_url=target_url,
         output_root=output_root,
         display_limit=display_limit,
         cdx_limit=cdx_limit,
-        error=None,
     )
 
 
@@ -1805,39 +2402,31 @@ def analyze_target():
 def check_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
 
     try:
         output_root = _resolve_output_root(output_root_input)
         inspect = _cached_inspect(target_url, 10, 1500)
         analysis = _cached_analyze(target_url, selected_snapshot)
         check = tool.audit(target_url, str(output_root), selected_snapshot)
-        check_key = f"c|{target_url}|{check.get('snapshot', selected_snapshot)}"
+        check_key = _check_key(target_url, check.get("snapshot", selected_snapshot))
         store.set_check_cache(check_key, target_url, check.get("snapshot", selected_snapshot), check)
         store.upsert_project(target_url, output_root=str(output_root), snapshot=check.get("snapshot"))
     except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=selected_snapshot or None,
             target_url=target_url,
             output_root=output_root_input,
             error=str(exc),
         )
 
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
         check=check,
         selected_snapshot=selected_snapshot,
         target_url=target_url,
         output_root=str(output_root),
-        error=None,
     )
 
 
@@ -1845,57 +2434,60 @@ def check_target():
 def sitemap_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
 
     try:
         output_root = _resolve_output_root(output_root_input)
         inspect = _cached_inspect(target_url, 10, 1500)
         analysis = _cached_analyze(target_url, selected_snapshot)
-        site_key = f"s|{target_url}|{analysis.get('selected_snapshot','')}"
-        sitemap = store.get_sitemap_cache(site_key, CACHE_TTL_SECONDS)
-        if sitemap is None:
-            sitemap = _build_sitemap_from_analysis(analysis)
-            store.set_sitemap_cache(site_key, target_url, analysis.get("selected_snapshot", ""), sitemap)
+        sitemap = _get_or_build_sitemap(target_url, analysis)
         store.upsert_project(target_url, output_root=str(output_root), snapshot=analysis.get("selected_snapshot"))
     except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
-            sitemap=None,
+        return _render_index(
             selected_snapshot=selected_snapshot or None,
             target_url=target_url,
             output_root=output_root_input,
             error=str(exc),
         )
 
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
-        check=None,
         sitemap=sitemap,
         selected_snapshot=selected_snapshot,
         target_url=target_url,
         output_root=str(output_root),
-        error=None,
     )
 
 
+def _stream_csv(header: list, rows, batch_rows: int = 10000):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_rows))
+        if batch:
+            writer.writerows(batch)
+        chunk = buffer.getvalue()
+        if chunk:
+            yield chunk.encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if len(batch) < batch_rows:
+            return
+
+
 @app.post("/sitemap/export/json")
 def sitemap_export_json():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
     analysis = _cached_analyze(target_url, selected_snapshot)
-    site_key = f"s|{target_url}|{analysis.get('selected_snapshot','')}"
-    sitemap = store.get_sitemap_cache(site_key, CACHE_TTL_SECONDS)
-    if sitemap is None:
-        sitemap = _build_sitemap_from_analysis(analysis)
-        store.set_sitemap_cache(site_key, target_url, analysis.get("selected_snapshot", ""), sitemap)
-    payload = json.dumps(sitemap, indent=2)
+    sitemap = _get_or_build_sitemap(target_url, analysis)
+    if orjson is not None:
+        payload = orjson.dumps(sitemap, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(sitemap, indent=2)
     filename = f"sitemap_{tool._safe_name(target_url)}_{analysis.get('selected_snapshot','latest')}.json"
     return Response(
         payload,
@@ -1909,25 +2501,14 @@ def sitemap_export_csv():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
     analysis = _cached_analyze(target_url, selected_snapshot)
-    site_key = f"s|{target_url}|{analysis.get('selected_snapshot','')}"
-    sitemap = store.get_sitemap_cache(site_key, CACHE_TTL_SECONDS)
-    if sitemap is None:
-        sitemap = _build_sitemap_from_analysis(analysis)
-        store.set_sitemap_cache(site_key, target_url, analysis.get("selected_snapshot", ""), sitemap)
-
-    stream = io.StringIO()
-    writer = csv.writer(stream)
-    writer.writerow(["folder", "page"])
-    for group in sitemap.get("groups", []):
-        folder = group.get("folder", "")
-        for page in group.get("pages", []):
-            writer.writerow([folder, page])
+    sitemap = _get_or_build_sitemap(target_url, analysis)
 
     filename = f"sitemap_{tool._safe_name(target_url)}_{analysis.get('selected_snapshot','latest')}.csv"
     return Response(
-        stream.getvalue(),
+        _stream_csv(["folder", "page"], _sitemap_rows(sitemap)),
         mimetype="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
+        direct_passthrough=True,
     )
 
 
@@ -1935,7 +2516,7 @@ def sitemap_export_csv():
 def download_missing_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     missing_limit = _parse_missing_limit(request.form.get("missing_limit"))
 
     try:
@@ -1949,7 +2530,7 @@ def download_missing_target():
         inspect = _cached_inspect(target_url, 10, 1500)
         analysis = _cached_analyze(target_url, selected_snapshot)
         check = tool.audit(target_url, str(output_root), selected_snapshot)
-        check_key = f"c|{target_url}|{check.get('snapshot', selected_snapshot)}"
+        check_key = _check_key(target_url, check.get("snapshot", selected_snapshot))
         store.set_check_cache(check_key, target_url, check.get("snapshot", selected_snapshot), check)
         store.upsert_project(target_url, output_root=str(output_root), snapshot=check.get("snapshot"))
         message = (
@@ -1957,21 +2538,14 @@ def download_missing_target():
             f"({repair['bytes_added_human']}), failed {repair['failed']} in {repair['seconds']}s"
         )
     except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        return _render_index(
             selected_snapshot=selected_snapshot or None,
             target_url=target_url,
             output_root=output_root_input,
             error=str(exc),
         )
 
-    return render_template(
-        "index.html",
-        result=None,
+    return _render_index(
         inspect=inspect,
         analysis=analysis,
         check=check,
@@ -1979,67 +2553,28 @@ def download_missing_target():
         target_url=target_url,
         output_root=str(output_root),
         action_message=message,
-        error=None,
     )
 
 
-def _start_download_job(target_url: str, selected_snapshot: str, max_files: int, output_root_input: str) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
+def _relative_output(output_dir: str) -> str:
+    path = Path(output_dir).resolve()
+    try:
+        return path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return Path(os.path.relpath(path, BASE_DIR)).as_posix()
 
-    with JOBS_LOCK:
-        JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
-            "progress": _queued_progress(
-                started_at,
-                files_downloaded=0,
-                max_files=max_files,
-                bytes_downloaded=0,
-                recovered_files=0,
-                current_url="",
-                queue_size=0,
-            ),
-            "result": None,
-        }
 
-    def _runner() -> None:
+def _start_download_job(target_url: str, selected_snapshot: str, max_files: int, output_root_input: str) -> str:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
             output_root = _resolve_output_root(output_root_input)
 
-            def _update(payload: dict) -> None:
-                with JOBS_LOCK:
-                    if job_id in JOBS:
-                        if not JOBS[job_id].get("paused", False):
-                            JOBS[job_id]["state"] = "running"
-                        JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="download", message="Downloading")
+            _update = _ProgressUpdater(JOBS, job_id, started_at, stage="download", message="Downloading")
 
             def _wait_if_paused(current_url: str) -> None:
-                while True:
-                    with JOBS_LOCK:
-                        job = JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        is_paused = bool(job.get("paused", False))
-                        if is_paused:
-                            job["state"] = "paused"
-                            progress = dict(job.get("progress", {}))
-                            progress["message"] = "Paused by user"
-                            progress["current_url"] = current_url
-                            progress["current_item"] = current_url
-                            job["progress"] = _normalize_progress(progress, started_at, stage="paused", message="Paused by user")
-                        else:
-                            if job.get("state") == "paused":
-                                job["state"] = "running"
-                    if not is_paused:
-                        return
-                    time.sleep(0.5)
+                _wait_while_paused(
+                    JOBS, job_id, started_at, "current_url", current_url, before_pause=_update.flush, resume_message="Resuming..."
+                )
 
             result = tool.run(
                 target_url,
@@ -2049,42 +2584,40 @@ def _start_download_job(target_url: str, selected_snapshot: str, max_files: int,
                 progress_callback=_update,
                 wait_if_paused=_wait_if_paused,
             )
+            _update.flush()
             result_payload = asdict(result)
-            with JOBS_LOCK:
-                size_bytes = JOBS.get(job_id, {}).get("progress", {}).get("bytes_downloaded", 0)
+            size_bytes = (JOBS.get(job_id) or {}).get("progress", {}).get("bytes_downloaded", 0)
             result_payload["downloaded_size_bytes"] = size_bytes
-            store.upsert_project(
+            result_payload["rel_output"] = _relative_output(result.output_dir)
+            _write_behind(
+                "upsert_project",
                 target_url,
                 output_root=str(output_root),
                 snapshot=result_payload.get("latest_snapshot"),
             )
-            store.add_job_history("download", target_url, "done", snapshot=result_payload.get("latest_snapshot"), summary=result_payload)
-
-            with JOBS_LOCK:
-                if job_id in JOBS:
-                    JOBS[job_id]["state"] = "done"
-                    done_progress = dict(JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Download completed"
-                    done_progress["percent"] = 100
-                    JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Download completed")
-                    JOBS[job_id]["result"] = result_payload
+            _write_behind("add_job_history", "download", target_url, "done", snapshot=result_payload.get("latest_snapshot"), summary=result_payload)
+            _finish_job(JOBS, job_id, started_at, "Download completed", result_payload)
         except Exception as exc:
-            store.add_job_history("download", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
-            with JOBS_LOCK:
-                if job_id in JOBS:
-                    JOBS[job_id]["state"] = "error"
-                    JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
+            _write_behind("add_job_history", "download", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
+            _fail_job(JOBS, job_id, started_at, str(exc))
 
-    thread = threading.Thread(target=_runner, daemon=True)
-    thread.start()
-    return job_id
+    return _start_job(
+        JOBS,
+        _runner,
+        fields={
+            "target_url": target_url,
+            "selected_snapshot": selected_snapshot,
+            "output_root": output_root_input,
+        },
+        progress={
+            "files_downloaded": 0,
+            "max_files": max_files,
+            "bytes_downloaded": 0,
+            "recovered_files": 0,
+            "current_url": "",
+            "queue_size": 0,
+        },
+    )
 
 
 def _start_missing_job(
@@ -2094,68 +2627,14 @@ def _start_missing_job(
     missing_limit: int,
     skip_errors: bool,
 ) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-
-    with MISSING_JOBS_LOCK:
-        MISSING_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
-            "progress": _queued_progress(
-                started_at,
-                attempted=0,
-                total=missing_limit,
-                added=0,
-                failed=0,
-                bytes_added=0,
-                current_url="",
-            ),
-            "result": None,
-        }
-
-    def _runner() -> None:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
             output_root = _resolve_output_root(output_root_input)
 
-            def _update(payload: dict) -> None:
-                with MISSING_JOBS_LOCK:
-                    if job_id in MISSING_JOBS:
-                        if not MISSING_JOBS[job_id].get("paused", False):
-                            MISSING_JOBS[job_id]["state"] = "running"
-                        MISSING_JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="missing", message="Downloading missing files")
-
-            def _should_abort() -> bool:
-                with MISSING_JOBS_LOCK:
-                    job = MISSING_JOBS.get(job_id)
-                    if not job:
-                        return True
-                    return bool(job.get("cancelled", False))
+            _update = _ProgressUpdater(MISSING_JOBS, job_id, started_at, stage="missing", message="Downloading missing files")
 
             def _wait_if_paused(current_url: str) -> None:
-                while True:
-                    with MISSING_JOBS_LOCK:
-                        job = MISSING_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        is_paused = bool(job.get("paused", False))
-                        if is_paused:
-                            job["state"] = "paused"
-                            progress = dict(job.get("progress", {}))
-                            progress["message"] = "Paused by user"
-                            progress["current_url"] = current_url
-                            progress["current_item"] = current_url
-                            job["progress"] = _normalize_progress(progress, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not is_paused:
-                        return
-                    time.sleep(0.5)
+                _wait_while_paused(MISSING_JOBS, job_id, started_at, "current_url", current_url, before_pause=_update.flush)
 
             result = tool.download_missing(
                 target_url,
@@ -2164,101 +2643,36 @@ def _start_missing_job(
                 limit=missing_limit,
                 progress_callback=_update,
                 skip_errors=skip_errors,
-                should_abort=_should_abort,
+                should_abort=_abort_check(MISSING_JOBS, job_id),
                 wait_if_paused=_wait_if_paused,
             )
-            with MISSING_JOBS_LOCK:
-                if job_id in MISSING_JOBS:
-                    MISSING_JOBS[job_id]["state"] = "done"
-                    done_progress = dict(MISSING_JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Missing files download completed"
-                    done_progress["percent"] = 100
-                    MISSING_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Missing files download completed")
-                    MISSING_JOBS[job_id]["result"] = result
-            store.add_job_history("missing", target_url, "done", snapshot=result.get("snapshot"), summary=result)
+            _finish_job(MISSING_JOBS, job_id, started_at, "Missing files download completed", result)
+            _write_behind("add_job_history", "missing", target_url, "done", snapshot=result.get("snapshot"), summary=result)
         except Exception as exc:
-            store.add_job_history("missing", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
-            with MISSING_JOBS_LOCK:
-                if job_id in MISSING_JOBS:
-                    MISSING_JOBS[job_id]["state"] = "error"
-                    MISSING_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(MISSING_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    MISSING_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
-
-    thread = threading.Thread(target=_runner, daemon=True)
-    thread.start()
-    return job_id
+            _write_behind("add_job_history", "missing", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
+            _fail_job(MISSING_JOBS, job_id, started_at, str(exc))
+
+    return _start_job(
+        MISSING_JOBS,
+        _runner,
+        progress={
+            "attempted": 0,
+            "total": missing_limit,
+            "added": 0,
+            "failed": 0,
+            "bytes_added": 0,
+            "current_url": "",
+        },
+    )
 
 
 def _start_inspect_job(target_url: str, output_root_input: str, display_limit: int, cdx_limit: int) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-
-    with INSPECT_JOBS_LOCK:
-        INSPECT_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
-            "target_url": target_url,
-            "output_root": output_root_input,
-            "display_limit": display_limit,
-            "cdx_limit": cdx_limit,
-            "progress": _queued_progress(
-                started_at,
-                variants_done=0,
-                variants_total=0,
-                current_variant="",
-                total_captures=0,
-                total_ok=0,
-            ),
-            "result": None,
-        }
-
-    def _runner() -> None:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
-            def _update(payload: dict) -> None:
-                with INSPECT_JOBS_LOCK:
-                    if job_id in INSPECT_JOBS:
-                        if not INSPECT_JOBS[job_id].get("paused", False):
-                            INSPECT_JOBS[job_id]["state"] = "running"
-                        INSPECT_JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="inspect", message="Inspecting snapshots")
+            _update = _ProgressUpdater(INSPECT_JOBS, job_id, started_at, stage="inspect", message="Inspecting snapshots")
 
             def _wait_if_paused(current_variant: str) -> None:
-                while True:
-                    with INSPECT_JOBS_LOCK:
-                        job = INSPECT_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        is_paused = bool(job.get("paused", False))
-                        if is_paused:
-                            job["state"] = "paused"
-                            progress = dict(job.get("progress", {}))
-                            progress["message"] = "Paused by user"
-                            progress["current_variant"] = current_variant
-                            progress["current_item"] = current_variant
-                            job["progress"] = _normalize_progress(progress, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not is_paused:
-                        return
-                    time.sleep(0.5)
-
-            def _should_abort() -> bool:
-                with INSPECT_JOBS_LOCK:
-                    job = INSPECT_JOBS.get(job_id)
-                    if not job:
-                        return True
-                    return bool(job.get("cancelled", False))
+                _wait_while_paused(INSPECT_JOBS, job_id, started_at, "current_variant", current_variant, before_pause=_update.flush)
 
             result = tool.inspect(
                 target_url,
@@ -2266,61 +2680,51 @@ def _start_inspect_job(target_url: str, output_root_input: str, display_limit: i
                 display_limit=display_limit,
                 cdx_limit=cdx_limit,
                 wait_if_paused=_wait_if_paused,
-                should_abort=_should_abort,
+                should_abort=_abort_check(INSPECT_JOBS, job_id),
             )
-            inspect_key = f"i|{target_url}|{display_limit}|{cdx_limit}"
+            inspect_key = _inspect_key(target_url, display_limit, cdx_limit)
             store.set_inspect_cache(inspect_key, target_url, display_limit, cdx_limit, result)
-            store.upsert_project(target_url, output_root=output_root_input, snapshot=result.get("latest_snapshot"))
-            store.add_job_history("inspect", target_url, "done", snapshot=result.get("latest_snapshot"), summary={"total": result.get("total_snapshots")})
-            with INSPECT_JOBS_LOCK:
-                if job_id in INSPECT_JOBS:
-                    INSPECT_JOBS[job_id]["state"] = "done"
-                    done_progress = dict(INSPECT_JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Inspect completed"
-                    done_progress["percent"] = 100
-                    INSPECT_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Inspect completed")
-                    INSPECT_JOBS[job_id]["result"] = _with_cache_meta(result, "archive", 0)
+            _cache_set(INSPECT_CACHE, inspect_key, result)
+            _write_behind("upsert_project", target_url, output_root=output_root_input, snapshot=result.get("latest_snapshot"))
+            _write_behind("add_job_history", "inspect", target_url, "done", snapshot=result.get("latest_snapshot"), summary={"total": result.get("total_snapshots")})
+            _finish_job(INSPECT_JOBS, job_id, started_at, "Inspect completed", _with_cache_meta(result, "archive", 0))
         except Exception as exc:
             message = str(exc)
             lowered = message.lower()
             if "temporarily unavailable" in lowered or "503" in lowered:
                 cached = _cached_inspect_only(target_url, display_limit, cdx_limit)
                 if cached is not None:
-                    cached = dict(cached)
                     cached["_fallback_notice"] = "Archive temporarily unavailable (503). Loaded from local inspect cache."
-                    store.add_job_history(
+                    _write_behind(
+                        "add_job_history",
                         "inspect",
                         target_url,
                         "done",
                         snapshot=cached.get("latest_snapshot"),
                         summary={"fallback": "cache", "reason": "archive_unavailable"},
                     )
-                    with INSPECT_JOBS_LOCK:
-                        if job_id in INSPECT_JOBS:
-                            INSPECT_JOBS[job_id]["state"] = "done"
-                            done_progress = dict(INSPECT_JOBS[job_id].get("progress", {}))
-                            done_progress["stage"] = "done"
-                            done_progress["message"] = "Archive unavailable; loaded local cache"
-                            done_progress["percent"] = 100
-                            INSPECT_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Archive unavailable; loaded local cache")
-                            INSPECT_JOBS[job_id]["result"] = cached
+                    _finish_job(INSPECT_JOBS, job_id, started_at, "Archive unavailable; loaded local cache", cached)
                     return
-            store.add_job_history("inspect", target_url, "error", summary={"error": str(exc)})
-            with INSPECT_JOBS_LOCK:
-                if job_id in INSPECT_JOBS:
-                    INSPECT_JOBS[job_id]["state"] = "error"
-                    INSPECT_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(INSPECT_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    INSPECT_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
+            _write_behind("add_job_history", "inspect", target_url, "error", summary={"error": str(exc)})
+            _fail_job(INSPECT_JOBS, job_id, started_at, str(exc))
 
-    thread = threading.Thread(target=_runner, daemon=True)
-    thread.start()
-    return job_id
+    return _start_job(
+        INSPECT_JOBS,
+        _runner,
+        fields={
+            "target_url": target_url,
+            "output_root": output_root_input,
+            "display_limit": display_limit,
+            "cdx_limit": cdx_limit,
+        },
+        progress={
+            "variants_done": 0,
+            "variants_total": 0,
+            "current_variant": "",
+            "total_captures": 0,
+            "total_ok": 0,
+        },
+    )
 
 
 def _start_analyze_job(
@@ -2330,62 +2734,12 @@ def _start_analyze_job(
     cdx_limit: int,
     display_limit: int,
 ) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-    with ANALYZE_JOBS_LOCK:
-        ANALYZE_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
-            "target_url": target_url,
-            "selected_snapshot": selected_snapshot,
-            "output_root": output_root_input,
-            "display_limit": display_limit,
-            "cdx_limit": cdx_limit,
-            "progress": _queued_progress(started_at),
-            "result": None,
-        }
-
-    def _runner() -> None:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
-            def _update(payload: dict) -> None:
-                with ANALYZE_JOBS_LOCK:
-                    if job_id in ANALYZE_JOBS:
-                        if not ANALYZE_JOBS[job_id].get("paused", False):
-                            ANALYZE_JOBS[job_id]["state"] = "running"
-                        ANALYZE_JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="analyze", message="Analyzing snapshot")
+            _update = _ProgressUpdater(ANALYZE_JOBS, job_id, started_at, stage="analyze", message="Analyzing snapshot")
 
             def _wait_if_paused(label: str) -> None:
-                while True:
-                    with ANALYZE_JOBS_LOCK:
-                        job = ANALYZE_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        paused = bool(job.get("paused", False))
-                        if paused:
-                            job["state"] = "paused"
-                            p = dict(job.get("progress", {}))
-                            p["message"] = "Paused by user"
-                            p["label"] = label
-                            p["current_item"] = label
-                            job["progress"] = _normalize_progress(p, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not paused:
-                        return
-                    time.sleep(0.5)
-
-            def _should_abort() -> bool:
-                with ANALYZE_JOBS_LOCK:
-                    job = ANALYZE_JOBS.get(job_id)
-                    if not job:
-                        return True
-                    return bool(job.get("cancelled", False))
+                _wait_while_paused(ANALYZE_JOBS, job_id, started_at, "label", label, before_pause=_update.flush)
 
             analysis = tool.analyze(
                 target_url,
@@ -2393,11 +2747,13 @@ def _start_analyze_job(
                 cdx_limit=cdx_limit,
                 progress_callback=_update,
                 wait_if_paused=_wait_if_paused,
-                should_abort=_should_abort,
+                should_abort=_abort_check(ANALYZE_JOBS, job_id),
             )
-            analyze_key = f"a|{target_url}|{analysis.get('selected_snapshot', selected_snapshot)}|{cdx_limit}"
+            analyze_key = _analyze_key(target_url, analysis.get("selected_snapshot", selected_snapshot), cdx_limit)
             store.set_analyze_cache(analyze_key, target_url, analysis.get("selected_snapshot", selected_snapshot), cdx_limit, analysis)
-            store.upsert_project(
+            _cache_set(ANALYSIS_CACHE, analyze_key, analysis)
+            _write_behind(
+                "upsert_project",
                 target_url,
                 output_root=output_root_input,
                 snapshot=analysis.get("selected_snapshot"),
@@ -2405,60 +2761,45 @@ def _start_analyze_job(
                 estimated_files=int(analysis.get("estimated_files", 0) or 0),
                 estimated_size=int(analysis.get("estimated_size_bytes", 0) or 0),
             )
-            store.add_job_history("analyze", target_url, "done", snapshot=analysis.get("selected_snapshot"), summary={"type": analysis.get("site_type")})
-            with ANALYZE_JOBS_LOCK:
-                if job_id in ANALYZE_JOBS:
-                    ANALYZE_JOBS[job_id]["state"] = "done"
-                    done_progress = dict(ANALYZE_JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Analyze completed"
-                    done_progress["percent"] = 100
-                    ANALYZE_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Analyze completed")
-                    ANALYZE_JOBS[job_id]["result"] = _with_cache_meta(analysis, "archive", 0)
+            _write_behind("add_job_history", "analyze", target_url, "done", snapshot=analysis.get("selected_snapshot"), summary={"type": analysis.get("site_type")})
+            _finish_job(ANALYZE_JOBS, job_id, started_at, "Analyze completed", _with_cache_meta(analysis, "archive", 0))
         except Exception as exc:
             message = str(exc)
             lowered = message.lower()
             if "temporarily unavailable" in lowered or "503" in lowered:
-                cache_key = f"a|{target_url}|{selected_snapshot}|{cdx_limit}"
+                cache_key = _analyze_key(target_url, selected_snapshot, cdx_limit)
                 cached = _cache_get(ANALYSIS_CACHE, cache_key)
                 if cached is None:
                     row = store.get_analyze_cache_with_meta(cache_key, PERSISTENT_CACHE_MAX_AGE_SECONDS)
                     if row is not None:
                         cached = _with_cache_meta(row.get("payload", {}), "sqlite", int(row.get("age_seconds", 0)))
                 if cached is not None:
-                    cached = dict(cached)
+                    cached = cached.copy()
                     cached["_fallback_notice"] = "Archive temporarily unavailable (503). Loaded from local analysis cache."
-                    store.add_job_history(
+                    _write_behind(
+                        "add_job_history",
                         "analyze",
                         target_url,
                         "done",
                         snapshot=cached.get("selected_snapshot") or selected_snapshot,
                         summary={"fallback": "cache", "reason": "archive_unavailable"},
                     )
-                    with ANALYZE_JOBS_LOCK:
-                        if job_id in ANALYZE_JOBS:
-                            ANALYZE_JOBS[job_id]["state"] = "done"
-                            done_progress = dict(ANALYZE_JOBS[job_id].get("progress", {}))
-                            done_progress["stage"] = "done"
-                            done_progress["message"] = "Archive unavailable; loaded local analysis cache"
-                            done_progress["percent"] = 100
-                            ANALYZE_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Archive unavailable; loaded local analysis cache")
-                            ANALYZE_JOBS[job_id]["result"] = cached
+                    _finish_job(ANALYZE_JOBS, job_id, started_at, "Archive unavailable; loaded local analysis cache", cached)
                     return
-            store.add_job_history("analyze", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
-            with ANALYZE_JOBS_LOCK:
-                if job_id in ANALYZE_JOBS:
-                    ANALYZE_JOBS[job_id]["state"] = "error"
-                    ANALYZE_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(ANALYZE_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    ANALYZE_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
+            _write_behind("add_job_history", "analyze", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
+            _fail_job(ANALYZE_JOBS, job_id, started_at, str(exc))
 
-    threading.Thread(target=_runner, daemon=True).start()
-    return job_id
+    return _start_job(
+        ANALYZE_JOBS,
+        _runner,
+        fields={
+            "target_url": target_url,
+            "selected_snapshot": selected_snapshot,
+            "output_root": output_root_input,
+            "display_limit": display_limit,
+            "cdx_limit": cdx_limit,
+        },
+    )
 
 
 def _start_batch_analyze_job(
@@ -2469,33 +2810,7 @@ def _start_batch_analyze_job(
     analyze_cdx_limit: int,
     analyze_count: int,
 ) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-    with ANALYZE_BATCH_JOBS_LOCK:
-        ANALYZE_BATCH_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
-            "target_url": target_url,
-            "output_root": output_root_input,
-            "display_limit": display_limit,
-            "inspect_cdx_limit": inspect_cdx_limit,
-            "analyze_cdx_limit": analyze_cdx_limit,
-            "analyze_count": analyze_count,
-            "progress": _queued_progress(
-                started_at,
-                done=0,
-                total=analyze_count,
-                current_snapshot="",
-                last_site_type="",
-            ),
-            "result": None,
-        }
-
-    def _runner() -> None:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
             inspect = _cached_inspect(target_url, display_limit, inspect_cdx_limit)
             snapshots = list(inspect.get("snapshots", []))
@@ -2509,56 +2824,23 @@ def _start_batch_analyze_job(
             analyzed: list[dict] = []
 
             def _wait_if_paused(current_snapshot: str) -> None:
-                while True:
-                    with ANALYZE_BATCH_JOBS_LOCK:
-                        job = ANALYZE_BATCH_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        paused = bool(job.get("paused", False))
-                        if paused:
-                            job["state"] = "paused"
-                            p = dict(job.get("progress", {}))
-                            p["message"] = "Paused by user"
-                            p["current_snapshot"] = current_snapshot
-                            p["current_item"] = current_snapshot
-                            job["progress"] = _normalize_progress(p, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not paused:
-                        return
-                    time.sleep(0.5)
-
-            for idx, ts in enumerate(snapshots, start=1):
-                _wait_if_paused(ts)
-                with ANALYZE_BATCH_JOBS_LOCK:
-                    if job_id in ANALYZE_BATCH_JOBS:
-                        ANALYZE_BATCH_JOBS[job_id]["state"] = "running"
-                        ANALYZE_BATCH_JOBS[job_id]["progress"] = _normalize_progress({
-                            "stage": "analyze",
-                            "message": "Analyzing snapshots one-by-one",
-                            "percent": min(98, int((done / total) * 100)),
-                            "done": done,
-                            "total": total,
-                            "current_snapshot": ts,
-                            "current_item": ts,
-                            "last_site_type": analyzed[-1]["site_type"] if analyzed else "",
-                        }, started_at, stage="analyze", message="Analyzing snapshots one-by-one")
-
-                cached = store.get_latest_analyze_for_url(
-                    target_url,
-                    PERSISTENT_CACHE_MAX_AGE_SECONDS,
-                    snapshot=ts,
-                )
-                if cached is not None:
-                    data = _with_cache_meta(cached.get("payload", {}), "sqlite", int(cached.get("age_seconds", 0)))
-                else:
-                    data = _cached_analyze(target_url, ts, cdx_limit=analyze_cdx_limit)
+                _wait_while_paused(ANALYZE_BATCH_JOBS, job_id, started_at, "current_snapshot", current_snapshot)
+
+            last_site_type = ""
+            persisted: dict[str, dict] = {}
+            pending: deque[tuple[str, Future]] = deque()
+            workers = max(1, BATCH_ANALYZE_WORKERS)
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"batch-{job_id}")
+
+            def _collect() -> None:
+                nonlocal done, last_site_type
+                ts, future = pending.popleft()
+                data = future.result()
+                last_site_type = data.get("site_type", "Unknown")
                 analyzed.append(
                     {
                         "snapshot": data.get("selected_snapshot", ts),
-                        "site_type": data.get("site_type", "Unknown"),
+                        "site_type": last_site_type,
                         "estimated_files": int(data.get("estimated_files", 0) or 0),
                         "estimated_size_bytes": int(data.get("estimated_size_bytes", 0) or 0),
                         "source": (data.get("_cache") or {}).get("source", "archive"),
@@ -2566,101 +2848,97 @@ def _start_batch_analyze_job(
                 )
                 done += 1
 
+            try:
+                for idx, ts in enumerate(snapshots, start=1):
+                    _wait_if_paused(ts)
+                    progress = _normalize_progress({
+                        "stage": "analyze",
+                        "message": "Analyzing snapshots one-by-one",
+                        "percent": min(98, int((done / total) * 100)),
+                        "done": done,
+                        "total": total,
+                        "current_snapshot": ts,
+                        "current_item": ts,
+                        "last_site_type": last_site_type,
+                    }, started_at, stage="analyze", message="Analyzing snapshots one-by-one")
+
+                    def _running(job: dict) -> dict:
+                        if job.get("paused", False) or job.get("cancelled", False):
+                            return {"progress": progress}
+                        return {"state": "running", "progress": progress}
+
+                    ANALYZE_BATCH_JOBS.apply(job_id, _running)
+
+                    if (idx - 1) % 200 == 0:
+                        persisted = store.get_latest_analyze_for_snapshots(
+                            target_url,
+                            snapshots[idx - 1:idx + 199],
+                            PERSISTENT_CACHE_MAX_AGE_SECONDS,
+                        )
+                    cached = persisted.pop(ts, None)
+                    if cached is not None:
+                        future: Future = Future()
+                        future.set_result(_with_cache_meta(cached.get("payload", {}), "sqlite", int(cached.get("age_seconds", 0))))
+                    else:
+                        future = pool.submit(_cached_analyze, target_url, ts, analyze_cdx_limit)
+                    pending.append((ts, future))
+                    while pending and (len(pending) > workers or pending[0][1].done()):
+                        _collect()
+                while pending:
+                    _wait_if_paused(pending[0][0])
+                    _collect()
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+
             result = {
                 "target_url": target_url,
                 "total_requested": analyze_count,
                 "total_analyzed": done,
                 "snapshots": analyzed,
             }
-            store.add_job_history("analyze_batch", target_url, "done", summary=result)
-            with ANALYZE_BATCH_JOBS_LOCK:
-                if job_id in ANALYZE_BATCH_JOBS:
-                    ANALYZE_BATCH_JOBS[job_id]["state"] = "done"
-                    ANALYZE_BATCH_JOBS[job_id]["progress"] = _normalize_progress({
-                        "stage": "done",
-                        "message": "One-by-one analysis completed",
-                        "percent": 100,
-                        "done": done,
-                        "total": total,
-                        "current_snapshot": "",
-                        "current_item": "",
-                        "last_site_type": analyzed[-1]["site_type"] if analyzed else "",
-                    }, started_at, stage="done", message="One-by-one analysis completed")
-                    ANALYZE_BATCH_JOBS[job_id]["result"] = result
+            _write_behind("add_job_history", "analyze_batch", target_url, "done", summary=result)
+            final_progress = {
+                "done": done,
+                "total": total,
+                "current_snapshot": "",
+                "current_item": "",
+                "last_site_type": last_site_type,
+            }
+            ANALYZE_BATCH_JOBS.apply(job_id, lambda job: {"progress": {**(job.get("progress") or {}), **final_progress}})
+            _finish_job(ANALYZE_BATCH_JOBS, job_id, started_at, "One-by-one analysis completed", result)
         except Exception as exc:
-            store.add_job_history("analyze_batch", target_url, "error", summary={"error": str(exc)})
-            with ANALYZE_BATCH_JOBS_LOCK:
-                if job_id in ANALYZE_BATCH_JOBS:
-                    ANALYZE_BATCH_JOBS[job_id]["state"] = "error"
-                    ANALYZE_BATCH_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(ANALYZE_BATCH_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    ANALYZE_BATCH_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
-
-    threading.Thread(target=_runner, daemon=True).start()
-    return job_id
-
+            _write_behind("add_job_history", "analyze_batch", target_url, "error", summary={"error": str(exc)})
+            _fail_job(ANALYZE_BATCH_JOBS, job_id, started_at, str(exc))
 
-def _start_check_job(target_url: str, selected_snapshot: str, output_root_input: str) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-    with CHECK_JOBS_LOCK:
-        CHECK_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
+    return _start_job(
+        ANALYZE_BATCH_JOBS,
+        _runner,
+        fields={
             "target_url": target_url,
-            "selected_snapshot": selected_snapshot,
             "output_root": output_root_input,
-            "progress": _queued_progress(started_at),
-            "result": None,
-        }
+            "display_limit": display_limit,
+            "inspect_cdx_limit": inspect_cdx_limit,
+            "analyze_cdx_limit": analyze_cdx_limit,
+            "analyze_count": analyze_count,
+        },
+        progress={
+            "done": 0,
+            "total": analyze_count,
+            "current_snapshot": "",
+            "last_site_type": "",
+        },
+    )
+
 
-    def _runner() -> None:
+def _start_check_job(target_url: str, selected_snapshot: str, output_root_input: str) -> str:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
             output_root = _resolve_output_root(output_root_input)
 
-            def _update(payload: dict) -> None:
-                with CHECK_JOBS_LOCK:
-                    if job_id in CHECK_JOBS:
-                        if not CHECK_JOBS[job_id].get("paused", False):
-                            CHECK_JOBS[job_id]["state"] = "running"
-                        CHECK_JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="check", message="Checking files")
+            _update = _ProgressUpdater(CHECK_JOBS, job_id, started_at, stage="check", message="Checking files")
 
             def _wait_if_paused(label: str) -> None:
-                while True:
-                    with CHECK_JOBS_LOCK:
-                        job = CHECK_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        paused = bool(job.get("paused", False))
-                        if paused:
-                            job["state"] = "paused"
-                            p = dict(job.get("progress", {}))
-                            p["message"] = "Paused by user"
-                            p["label"] = label
-                            p["current_item"] = label
-                            job["progress"] = _normalize_progress(p, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not paused:
-                        return
-                    time.sleep(0.5)
-
-            def _should_abort() -> bool:
-                with CHECK_JOBS_LOCK:
-                    job = CHECK_JOBS.get(job_id)
-                    if not job:
-                        return True
-                    return bool(job.get("cancelled", False))
+                _wait_while_paused(CHECK_JOBS, job_id, started_at, "label", label, before_pause=_update.flush)
 
             check = tool.audit(
                 target_url,
@@ -2668,94 +2946,35 @@ def _start_check_job(target_url: str, selected_snapshot: str, output_root_input:
                 selected_snapshot,
                 progress_callback=_update,
                 wait_if_paused=_wait_if_paused,
-                should_abort=_should_abort,
+                should_abort=_abort_check(CHECK_JOBS, job_id),
             )
-            check_key = f"c|{target_url}|{check.get('snapshot', selected_snapshot)}"
+            check_key = _check_key(target_url, check.get("snapshot", selected_snapshot))
             store.set_check_cache(check_key, target_url, check.get("snapshot", selected_snapshot), check)
-            store.upsert_project(target_url, output_root=str(output_root), snapshot=check.get("snapshot"))
-            store.add_job_history("check", target_url, "done", snapshot=check.get("snapshot"), summary={"coverage": check.get("coverage_percent")})
-            with CHECK_JOBS_LOCK:
-                if job_id in CHECK_JOBS:
-                    CHECK_JOBS[job_id]["state"] = "done"
-                    done_progress = dict(CHECK_JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Check completed"
-                    done_progress["percent"] = 100
-                    CHECK_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Check completed")
-                    CHECK_JOBS[job_id]["result"] = check
+            _write_behind("upsert_project", target_url, output_root=str(output_root), snapshot=check.get("snapshot"))
+            _write_behind("add_job_history", "check", target_url, "done", snapshot=check.get("snapshot"), summary={"coverage": check.get("coverage_percent")})
+            _finish_job(CHECK_JOBS, job_id, started_at, "Check completed", check)
         except Exception as exc:
-            store.add_job_history("check", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
-            with CHECK_JOBS_LOCK:
-                if job_id in CHECK_JOBS:
-                    CHECK_JOBS[job_id]["state"] = "error"
-                    CHECK_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(CHECK_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    CHECK_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
-
-    threading.Thread(target=_runner, daemon=True).start()
-    return job_id
+            _write_behind("add_job_history", "check", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
+            _fail_job(CHECK_JOBS, job_id, started_at, str(exc))
 
-
-def _start_sitemap_job(target_url: str, selected_snapshot: str, output_root_input: str, cdx_limit: int) -> str:
-    _claim_job_slot()
-    job_id = uuid.uuid4().hex
-    started_at = time.time()
-    with SITEMAP_JOBS_LOCK:
-        SITEMAP_JOBS[job_id] = {
-            "state": "queued",
-            "paused": False,
-            "cancelled": False,
-            "error": None,
-            "started_at": started_at,
+    return _start_job(
+        CHECK_JOBS,
+        _runner,
+        fields={
             "target_url": target_url,
             "selected_snapshot": selected_snapshot,
             "output_root": output_root_input,
-            "cdx_limit": cdx_limit,
-            "progress": _queued_progress(started_at),
-            "result": None,
-        }
+        },
+    )
 
-    def _runner() -> None:
+
+def _start_sitemap_job(target_url: str, selected_snapshot: str, output_root_input: str, cdx_limit: int) -> str:
+    def _runner(job_id: str, started_at: float) -> None:
         try:
-            def _update(payload: dict) -> None:
-                with SITEMAP_JOBS_LOCK:
-                    if job_id in SITEMAP_JOBS:
-                        if not SITEMAP_JOBS[job_id].get("paused", False):
-                            SITEMAP_JOBS[job_id]["state"] = "running"
-                        SITEMAP_JOBS[job_id]["progress"] = _normalize_progress(payload, started_at, stage="sitemap", message="Building sitemap")
+            _update = _ProgressUpdater(SITEMAP_JOBS, job_id, started_at, stage="sitemap", message="Building sitemap")
 
             def _wait_if_paused(label: str) -> None:
-                while True:
-                    with SITEMAP_JOBS_LOCK:
-                        job = SITEMAP_JOBS.get(job_id)
-                        if not job:
-                            return
-                        if bool(job.get("cancelled", False)):
-                            raise RuntimeError("Stopped by user")
-                        paused = bool(job.get("paused", False))
-                        if paused:
-                            job["state"] = "paused"
-                            p = dict(job.get("progress", {}))
-                            p["message"] = "Paused by user"
-                            p["label"] = label
-                            p["current_item"] = label
-                            job["progress"] = _normalize_progress(p, started_at, stage="paused", message="Paused by user")
-                        elif job.get("state") == "paused":
-                            job["state"] = "running"
-                    if not paused:
-                        return
-                    time.sleep(0.5)
-
-            def _should_abort() -> bool:
-                with SITEMAP_JOBS_LOCK:
-                    job = SITEMAP_JOBS.get(job_id)
-                    if not job:
-                        return True
-                    return bool(job.get("cancelled", False))
+                _wait_while_paused(SITEMAP_JOBS, job_id, started_at, "label", label, before_pause=_update.flush)
 
             analysis = tool.analyze(
                 target_url,
@@ -2763,37 +2982,28 @@ def _start_sitemap_job(target_url: str, selected_snapshot: str, output_root_inpu
                 cdx_limit=cdx_limit,
                 progress_callback=_update,
                 wait_if_paused=_wait_if_paused,
-                should_abort=_should_abort,
+                should_abort=_abort_check(SITEMAP_JOBS, job_id),
             )
             sitemap = _build_sitemap_from_analysis(analysis)
-            site_key = f"s|{target_url}|{analysis.get('selected_snapshot','')}"
+            site_key = _sitemap_key(target_url, analysis.get("selected_snapshot", ""))
             store.set_sitemap_cache(site_key, target_url, analysis.get("selected_snapshot", ""), sitemap)
-            store.upsert_project(target_url, output_root=output_root_input, snapshot=analysis.get("selected_snapshot"))
-            store.add_job_history("sitemap", target_url, "done", snapshot=analysis.get("selected_snapshot"), summary={"pages": sitemap.get("total_pages")})
-            with SITEMAP_JOBS_LOCK:
-                if job_id in SITEMAP_JOBS:
-                    SITEMAP_JOBS[job_id]["state"] = "done"
-                    done_progress = dict(SITEMAP_JOBS[job_id].get("progress", {}))
-                    done_progress["stage"] = "done"
-                    done_progress["message"] = "Sitemap completed"
-                    done_progress["percent"] = 100
-                    SITEMAP_JOBS[job_id]["progress"] = _normalize_progress(done_progress, started_at, stage="done", message="Sitemap completed")
-                    SITEMAP_JOBS[job_id]["result"] = {"analysis": _with_cache_meta(analysis, "archive", 0), "sitemap": sitemap}
+            _write_behind("upsert_project", target_url, output_root=output_root_input, snapshot=analysis.get("selected_snapshot"))
+            _write_behind("add_job_history", "sitemap", target_url, "done", snapshot=analysis.get("selected_snapshot"), summary={"pages": sitemap.get("total_pages")})
+            _finish_job(SITEMAP_JOBS, job_id, started_at, "Sitemap completed", {"analysis": _with_cache_meta(analysis, "archive", 0), "sitemap": sitemap})
         except Exception as exc:
-            store.add_job_history("sitemap", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
-            with SITEMAP_JOBS_LOCK:
-                if job_id in SITEMAP_JOBS:
-                    SITEMAP_JOBS[job_id]["state"] = "error"
-                    SITEMAP_JOBS[job_id]["error"] = str(exc)
-                    err_progress = dict(SITEMAP_JOBS[job_id].get("progress", {}))
-                    err_progress["stage"] = "error"
-                    err_progress["message"] = str(exc)
-                    SITEMAP_JOBS[job_id]["progress"] = _normalize_progress(err_progress, started_at, stage="error", message=str(exc))
-        finally:
-            _release_job_slot()
+            _write_behind("add_job_history", "sitemap", target_url, "error", snapshot=selected_snapshot or None, summary={"error": str(exc)})
+            _fail_job(SITEMAP_JOBS, job_id, started_at, str(exc))
 
-    threading.Thread(target=_runner, daemon=True).start()
-    return job_id
+    return _start_job(
+        SITEMAP_JOBS,
+        _runner,
+        fields={
+            "target_url": target_url,
+            "selected_snapshot": selected_snapshot,
+            "output_root": output_root_input,
+            "cdx_limit": cdx_limit,
+        },
+    )
 
 
 @app.post("/download/start")
@@ -2801,7 +3011,7 @@ def download_start():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
     max_files = _parse_max_files(request.form.get("max_files"))
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
 
     if not target_url:
         return jsonify({"ok": False, "error": "URL is required"}), 400
@@ -2815,19 +3025,53 @@ def download_start():
 
 @app.get("/download/status/<job_id>")
 def download_status(job_id: str):
-    return _job_status_response(job_id, JOBS, JOBS_LOCK)
+    return _job_status_response(job_id, JOBS)
+
+
+@app.get("/download/events/<job_id>")
+def download_events(job_id: str):
+    return _job_events_response(job_id, JOBS)
+
+
+@app.get("/download/result/<job_id>")
+def download_result(job_id: str):
+    job = JOBS.get(job_id)
+    if not job:
+        return _render_index(
+            selected_snapshot=None,
+            target_url="",
+            output_root=OUTPUT_ROOT_STR,
+            error="Download job not found",
+        )
 
+    target_url = job.get("target_url", "")
+    output_root = job.get("output_root") or OUTPUT_ROOT_STR
+    if job.get("state") != "done" or not job.get("result"):
+        return _render_index(
+            selected_snapshot=job.get("selected_snapshot") or None,
+            target_url=target_url,
+            output_root=output_root,
+            error=job.get("error") or "Download job not completed yet",
+        )
 
-@app.post("/download/stop/<job_id>")
-def download_stop(job_id: str):
-    return _job_stop_response(job_id, JOBS, JOBS_LOCK)
+    result = job["result"]
+    selected_snapshot = result.get("latest_snapshot") or job.get("selected_snapshot") or None
+    return _render_index(
+        result=result,
+        rel_output=result.get("rel_output"),
+        inspect=_best_inspect_for_render(target_url),
+        analysis=_best_analyze_for_render(target_url, selected_snapshot=selected_snapshot or ""),
+        selected_snapshot=selected_snapshot,
+        target_url=target_url,
+        output_root=output_root,
+    )
 
 
 @app.post("/download-missing/start")
 def download_missing_start():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
     missing_limit = _parse_missing_limit(request.form.get("missing_limit"))
     skip_errors = _parse_bool(request.form.get("skip_errors"), default=True)
 
@@ -2843,37 +3087,7 @@ def download_missing_start():
 
 @app.get("/download-missing/status/<job_id>")
 def download_missing_status(job_id: str):
-    return _job_status_response(job_id, MISSING_JOBS, MISSING_JOBS_LOCK)
-
-
-@app.post("/download-missing/stop/<job_id>")
-def download_missing_stop(job_id: str):
-    return _job_stop_response(job_id, MISSING_JOBS, MISSING_JOBS_LOCK)
-
-
-@app.post("/download-missing/pause/<job_id>")
-def download_missing_pause(job_id: str):
-    return _job_pause_response(job_id, MISSING_JOBS, MISSING_JOBS_LOCK)
-
-
-@app.post("/download-missing/resume/<job_id>")
-def download_missing_resume(job_id: str):
-    return _job_resume_response(job_id, MISSING_JOBS, MISSING_JOBS_LOCK)
-
-
-@app.post("/download/pause/<job_id>")
-def download_pause(job_id: str):
-    return _job_pause_response(job_id, JOBS, JOBS_LOCK)
-
-
-@app.post("/download/resume/<job_id>")
-def download_resume(job_id: str):
-    def _set_resuming(job: dict) -> None:
-        progress = dict(job.get("progress", {}))
-        progress["message"] = "Resuming..."
-        job["progress"] = progress
-
-    return _job_resume_response(job_id, JOBS, JOBS_LOCK, on_resume=_set_resuming)
+    return _job_status_response(job_id, MISSING_JOBS)
 
 
 @app.post("/download")
@@ -2881,48 +3095,47 @@ def download_target():
     target_url = _normalize_target_url(request.form.get("target_url", "").strip())
     selected_snapshot = request.form.get("selected_snapshot", "").strip()
     max_files = _parse_max_files(request.form.get("max_files"))
-    output_root_input = request.form.get("output_root", str(OUTPUT_ROOT_DIR)).strip()
+    output_root_input = request.form.get("output_root", OUTPUT_ROOT_STR).strip()
+
+    if not target_url:
+        return _form_error("URL is required", 400, output_root=output_root_input)
 
     try:
-        output_root = _resolve_output_root(output_root_input)
-        inspect = _cached_inspect(target_url, 10, 1500)
-        analysis = _cached_analyze(target_url, selected_snapshot)
-        result = tool.run(
-            target_url,
-            str(output_root),
-            max_files=max_files,
-            preferred_snapshot=selected_snapshot,
-        )
-    except Exception as exc:
-        return render_template(
-            "index.html",
-            result=None,
-            inspect=None,
-            analysis=None,
-            check=None,
+        job_id = _start_download_job(target_url, selected_snapshot, max_files, output_root_input)
+    except JobCapacityError as exc:
+        return _form_error(
+            str(exc),
+            429,
             selected_snapshot=selected_snapshot or None,
             target_url=target_url,
             output_root=output_root_input,
-            error=str(exc),
         )
 
-    rel_output = os.path.relpath(result.output_dir, str(BASE_DIR)).replace("\\", "/")
-    return render_template(
-        "index.html",
-        result=result,
-        inspect=inspect,
-        analysis=analysis,
-        check=None,
-        selected_snapshot=selected_snapshot,
+    return _render_index(
+        inspect=_best_inspect_for_render(target_url),
+        analysis=_best_analyze_for_render(target_url, selected_snapshot=selected_snapshot),
+        selected_snapshot=selected_snapshot or None,
         target_url=target_url,
-        output_root=str(output_root),
-        rel_output=rel_output,
-        error=None,
-    )
+        output_root=output_root_input,
+        action_message=f"Download started in the background (job {job_id}).",
+        download_job_id=job_id,
+    ), 202
+
+
+threading.Thread(target=_maintenance_loop, name="maintenance", daemon=True).start()
+threading.Thread(target=_store_writer_loop, name="store-writer", daemon=True).start()
+# Runs before the interpreter joins pool workers, so paused jobs wake up and exit.
+getattr(threading, "_register_atexit", atexit.register)(_shutdown_jobs)
 
 
 if __name__ == "__main__":
     host = os.environ.get("HOST", "127.0.0.1")
     port = int(os.environ.get("PORT", "5000"))
     debug = _parse_bool(os.environ.get("FLASK_DEBUG"), default=False)
-    app.run(host=host, port=port, debug=debug, use_reloader=False, threaded=True)
+    try:
+        if waitress is not None and not debug:
+            waitress.serve(app, host=host, port=port, threads=max(1, WSGI_THREADS))
+        else:
+            app.run(host=host, port=port, debug=debug, use_reloader=False, threaded=True)
+    finally:
+        _shutdown_jobs()
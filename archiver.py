@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import gzip
 import hashlib
+import heapq
 import json
 import os
+import random
 import re
 import threading
 import time
-from collections import OrderedDict, deque
-from dataclasses import dataclass
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import unquote, urljoin, urlparse, urlunparse
 
 import requests
@@ -17,14 +23,98 @@ from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 
 CDX_API = "https://web.archive.org/cdx/search/cdx"
 WAYBACK_RAW = "https://web.archive.org/web/{timestamp}id_/{url}"
 WAYBACK_AVAILABLE = "https://archive.org/wayback/available"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_GZIP_NAME = "manifest.json.gz"
+MANIFEST_NAMES = (MANIFEST_NAME, MANIFEST_GZIP_NAME)
+CDX_ROWS_CACHE_SECONDS = 600
+CDX_ROWS_CACHE_MAX_ITEMS = 32
+CDX_MAX_IN_FLIGHT = 16
+CDX_VARIANT_WINDOW = 2
 ATTRS_TO_SCAN = ("src", "href", "poster", "data-src", "data-href")
 CSS_URL_RE = re.compile(r"url\(([^)]+)\)", re.IGNORECASE)
 BAD_SCHEMES = ("javascript:", "mailto:", "tel:", "data:", "#")
 SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+BLOG_POST_RE = re.compile(r"/\d{4}/\d{2}/[^/]+/?$")
+NETLOC_RE = re.compile(r"https?://([^/?#]*)")
+URL_SIGNALS = (
+    ("wordpress", ("/wp-content/", "/wp-includes/", "/wp-json/")),
+    ("wix", ("wixstatic.com", "parastorage.com")),
+    ("shopify", ("shopify",)),
+)
+URL_SIGNAL_NEEDLES = tuple((needle, tag) for tag, needles in URL_SIGNALS for needle in needles)
+
+
+def _fast_netloc(url: str) -> str:
+    match = NETLOC_RE.match(url)
+    if match is not None:
+        return match.group(1)
+    return urlparse(url).netloc
+
+
+def _dump_manifest_bytes(payload: Dict[str, object]) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+def _load_manifest_bytes(data: bytes) -> object:
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+@lru_cache(maxsize=65536)
+def _cached_clean_url(url: str) -> str:
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, "", parsed.query, ""))
+
+
+@lru_cache(maxsize=65536)
+def _cached_safe_name(text: str) -> str:
+    value = SAFE_NAME_RE.sub("_", text.strip())
+    value = value.strip("._")
+    return value or "file"
+
+
+@lru_cache(maxsize=65536)
+def _cached_extension_of_url(value: str) -> str:
+    path = urlparse(value).path
+    base = path.rsplit("/", 1)[-1]
+    if "." not in base:
+        return "(none)"
+    ext = base.rsplit(".", 1)[-1].lower()
+    if not ext or len(ext) > 8:
+        return "(none)"
+    return "." + ext
+
+
+@lru_cache(maxsize=65536)
+def _cached_folder_of_path(path: str) -> str:
+    clean = path if path else "/"
+    if clean == "/":
+        return "/"
+    if clean.endswith("/"):
+        return clean
+    if "/" not in clean[1:]:
+        return "/"
+    return clean.rsplit("/", 1)[0] + "/"
 
 
 @dataclass
@@ -52,7 +142,79 @@ class ArchiveResult:
     seconds: float
 
 
+@dataclass(slots=True)
+class AnalyzeAggregator:
+    total_size: int = 0
+    mime: Counter[str] = field(default_factory=Counter)
+    ext: Counter[str] = field(default_factory=Counter)
+    signals: Counter[str] = field(default_factory=Counter)
+    folders: Counter[str] = field(default_factory=Counter)
+    pages: List[str] = field(default_factory=list)
+    wp_themes: set[str] = field(default_factory=set)
+    wp_plugins: set[str] = field(default_factory=set)
+    wp_categories: set[str] = field(default_factory=set)
+    wp_tags: set[str] = field(default_factory=set)
+    wp_post_types: set[str] = field(default_factory=set)
+    wp_blog_posts: List[str] = field(default_factory=list)
+    wp_json_routes: set[str] = field(default_factory=set)
+
+    def update(self, tool: "ArchiveWebTool", row: List[str]) -> None:
+        if len(row) < 5:
+            return
+        original = row[1]
+        mime = (row[2] or "unknown").lower()
+        length = row[3]
+        path = urlparse(original).path or "/"
+        lower_path = path.lower()
+
+        self.mime[mime] += 1
+        self.ext[_cached_extension_of_url(original)] += 1
+
+        if str(length).isdigit():
+            self.total_size += int(length)
+
+        signals = self.signals
+        lower_url = original.lower()
+        matched_tag = None
+        for needle, tag in URL_SIGNAL_NEEDLES:
+            if tag != matched_tag and needle in lower_url:
+                signals[tag] += 1
+                matched_tag = tag
+        if lower_url.endswith(".php"):
+            signals["php"] += 1
+
+        self.folders[_cached_folder_of_path(path)] += 1
+        if tool._looks_like_page(path, mime):
+            self.pages.append(path)
+
+        theme = tool._extract_wp_slug(lower_path, "/wp-content/themes/")
+        plugin = tool._extract_wp_slug(lower_path, "/wp-content/plugins/")
+        if theme:
+            self.wp_themes.add(theme)
+        if plugin:
+            self.wp_plugins.add(plugin)
+
+        category = tool._extract_wp_slug(lower_path, "/category/")
+        tag = tool._extract_wp_slug(lower_path, "/tag/")
+        if category:
+            self.wp_categories.add(unquote(category))
+        if tag:
+            self.wp_tags.add(unquote(tag))
+
+        route = tool._extract_wp_json_route(lower_path)
+        if route:
+            self.wp_json_routes.add(route)
+            parts = route.split("/")
+            if len(parts) >= 3 and parts[0] == "wp" and parts[1] == "v2":
+                self.wp_post_types.add(parts[2])
+
+        if BLOG_POST_RE.search(lower_path):
+            self.wp_blog_posts.append(path)
+
+
 class ArchiveWebTool:
+    _cdx_gate = threading.BoundedSemaphore(CDX_MAX_IN_FLIGHT)
+
     def __init__(self, timeout: int = 45) -> None:
         self.session = requests.Session()
         retry = Retry(
@@ -63,12 +225,25 @@ class ArchiveWebTool:
             status_forcelist=(429, 500, 502, 503, 504),
             allowed_methods=("GET",),
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        self._download_workers = max(1, int(os.environ.get("MISSING_DOWNLOAD_WORKERS", "4")))
+        pool_size = max(32, self._download_workers * 4)
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=8, pool_maxsize=pool_size, pool_block=False)
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
         self.timeout = timeout
         self._cdx_cache: "OrderedDict[str, List[str]]" = OrderedDict()
         self._cdx_cache_max_items = max(100, int(os.environ.get("CDX_CACHE_MAX_ITEMS", "5000")))
+        self._cdx_cache_lock = threading.Lock()
+        self._cdx_rows_cache: "OrderedDict[Tuple[str, str], Tuple[float, int, list]]" = OrderedDict()
+        self._cdx_rows_lock = threading.Lock()
+        self._cdx_rows_cache_rows = 0
+        self._cdx_rows_cache_max_rows = max(0, int(os.environ.get("CDX_ROWS_CACHE_MAX_ROWS", "50000")))
+        self._manifest_digests: Dict[str, Tuple[bytes, int, int]] = {}
+        self._manifest_gzip = os.environ.get("MANIFEST_GZIP", "0").strip().lower() in {"1", "true", "yes", "on"}
+        self._page_cache: "OrderedDict[Tuple[str, str], Tuple[bytes, str]]" = OrderedDict()
+        self._page_cache_bytes = 0
+        self._page_cache_max_bytes = max(0, int(os.environ.get("PAGE_CACHE_MAX_MB", "64"))) * 1024 * 1024
+        self._page_cache_lock = threading.Lock()
         self._wayback_min_interval_seconds = max(0.0, float(os.environ.get("WAYBACK_MIN_REQUEST_INTERVAL_MS", "250")) / 1000.0)
         self._wayback_rate_lock = threading.Lock()
         self._wayback_next_allowed_ts = 0.0
@@ -77,7 +252,7 @@ class ArchiveWebTool:
     def _throttle_wayback(self, url: str) -> None:
         if self._wayback_min_interval_seconds <= 0:
             return
-        host = (urlparse(url).netloc or "").lower()
+        host = _fast_netloc(url).lower()
         if "archive.org" not in host:
             return
 
@@ -92,17 +267,74 @@ class ArchiveWebTool:
             time.sleep(delay)
 
     def _cdx_cache_get(self, key: str) -> Optional[List[str]]:
-        cached = self._cdx_cache.pop(key, None)
-        if cached is None:
-            return None
-        self._cdx_cache[key] = cached
-        return cached
+        with self._cdx_cache_lock:
+            cached = self._cdx_cache.pop(key, None)
+            if cached is None:
+                return None
+            self._cdx_cache[key] = cached
+            return cached
 
     def _cdx_cache_set(self, key: str, value: List[str]) -> None:
-        self._cdx_cache.pop(key, None)
-        self._cdx_cache[key] = value
-        while len(self._cdx_cache) > self._cdx_cache_max_items:
-            self._cdx_cache.popitem(last=False)
+        with self._cdx_cache_lock:
+            self._cdx_cache.pop(key, None)
+            self._cdx_cache[key] = value
+            while len(self._cdx_cache) > self._cdx_cache_max_items:
+                self._cdx_cache.popitem(last=False)
+
+    def _cdx_rows_get(self, wildcard: str, to_timestamp: str, limit: int) -> Optional[list]:
+        key = (wildcard, to_timestamp)
+        with self._cdx_rows_lock:
+            entry = self._cdx_rows_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, cached_limit, rows = entry
+            if time.time() - stored_at > CDX_ROWS_CACHE_SECONDS:
+                del self._cdx_rows_cache[key]
+                self._cdx_rows_cache_rows -= len(rows)
+                return None
+            if cached_limit < limit and len(rows) - 1 >= cached_limit:
+                return None
+            self._cdx_rows_cache.move_to_end(key)
+        if cached_limit > limit:
+            return rows[: limit + 1]
+        return rows
+
+    def _cdx_rows_set(self, wildcard: str, to_timestamp: str, limit: int, rows: object) -> None:
+        if not isinstance(rows, list) or len(rows) > self._cdx_rows_cache_max_rows:
+            return
+        key = (wildcard, to_timestamp)
+        with self._cdx_rows_lock:
+            old = self._cdx_rows_cache.pop(key, None)
+            if old is not None:
+                self._cdx_rows_cache_rows -= len(old[2])
+            self._cdx_rows_cache[key] = (time.time(), limit, rows)
+            self._cdx_rows_cache_rows += len(rows)
+            while (
+                len(self._cdx_rows_cache) > CDX_ROWS_CACHE_MAX_ITEMS
+                or self._cdx_rows_cache_rows > self._cdx_rows_cache_max_rows
+            ):
+                _, (_, _, evicted) = self._cdx_rows_cache.popitem(last=False)
+                self._cdx_rows_cache_rows -= len(evicted)
+
+    def _page_cache_get(self, url: str, timestamp: str) -> Optional[Tuple[bytes, str]]:
+        with self._page_cache_lock:
+            cached = self._page_cache.get((url, timestamp))
+            if cached is not None:
+                self._page_cache.move_to_end((url, timestamp))
+            return cached
+
+    def _page_cache_set(self, url: str, timestamp: str, body: bytes, mime: str) -> None:
+        if len(body) > self._page_cache_max_bytes // 8:
+            return
+        with self._page_cache_lock:
+            old = self._page_cache.pop((url, timestamp), None)
+            if old is not None:
+                self._page_cache_bytes -= len(old[0])
+            self._page_cache[(url, timestamp)] = (body, mime)
+            self._page_cache_bytes += len(body)
+            while self._page_cache_bytes > self._page_cache_max_bytes:
+                _, (evicted, _) = self._page_cache.popitem(last=False)
+                self._page_cache_bytes -= len(evicted)
 
     def _mark_archive_unavailable(self, hold_seconds: int = 120) -> None:
         self._archive_unavailable_until = max(self._archive_unavailable_until, time.time() + max(30, hold_seconds))
@@ -131,11 +363,15 @@ class ArchiveWebTool:
         for attempt in range(max(0, retries) + 1):
             try:
                 self._throttle_wayback(url)
-                response = self.session.get(url, params=params, timeout=timeout)
+                if url == CDX_API:
+                    with self._cdx_gate:
+                        response = self.session.get(url, params=params, timeout=timeout)
+                else:
+                    response = self.session.get(url, params=params, timeout=timeout)
                 if int(response.status_code) == 503:
                     self._mark_archive_unavailable()
                     if attempt < retries:
-                        time.sleep(0.6 * (2 ** attempt))
+                        time.sleep(random.uniform(0.2, 0.6 * (2 ** attempt)))
                         continue
                 response.raise_for_status()
                 return response
@@ -144,7 +380,7 @@ class ArchiveWebTool:
                 if self._status_code_from_exception(exc) == 503:
                     self._mark_archive_unavailable()
                 if attempt < retries:
-                    time.sleep(0.6 * (2 ** attempt))
+                    time.sleep(random.uniform(0.2, 0.6 * (2 ** attempt)))
                     continue
                 break
 
@@ -269,20 +505,8 @@ class ArchiveWebTool:
             progress_stage="inventory",
         )
         file_count = len(unique_rows)
-        total_size = 0
-        mime_buckets: Dict[str, int] = {}
-        ext_buckets: Dict[str, int] = {}
-        signals: List[str] = []
-        folder_counts: Dict[str, int] = {}
-        page_candidates: List[str] = []
-
-        wp_themes: set[str] = set()
-        wp_plugins: set[str] = set()
-        wp_categories: set[str] = set()
-        wp_tags: set[str] = set()
-        wp_post_types: set[str] = set()
-        wp_blog_posts: List[str] = []
-        wp_json_routes: set[str] = set()
+        agg = AnalyzeAggregator()
+        signals = agg.signals
 
         for idx, row in enumerate(unique_rows, start=1):
             if should_abort is not None and should_abort():
@@ -298,79 +522,27 @@ class ArchiveWebTool:
                     processed=idx,
                     total=len(unique_rows),
                 )
-            if len(row) < 5:
-                continue
-            original = row[1]
-            mime = (row[2] or "unknown").lower()
-            length = row[3]
-            parsed = urlparse(original)
-            path = parsed.path or "/"
-            lower_path = path.lower()
-
-            mime_buckets[mime] = mime_buckets.get(mime, 0) + 1
-            ext = self._extension_of_url(original)
-            ext_buckets[ext] = ext_buckets.get(ext, 0) + 1
-
-            if str(length).isdigit():
-                total_size += int(length)
-
-            lower_url = original.lower()
-            if "/wp-content/" in lower_url or "/wp-includes/" in lower_url or "/wp-json/" in lower_url:
-                signals.append("wordpress")
-            if "wixstatic.com" in lower_url or "parastorage.com" in lower_url:
-                signals.append("wix")
-            if "cdn.shopify.com" in lower_url or "shopify" in lower_url:
-                signals.append("shopify")
-            if lower_url.endswith(".php"):
-                signals.append("php")
-
-            folder = self._folder_of_path(path)
-            folder_counts[folder] = folder_counts.get(folder, 0) + 1
-            if self._looks_like_page(path, mime):
-                page_candidates.append(path)
-
-            theme = self._extract_wp_slug(lower_path, "/wp-content/themes/")
-            plugin = self._extract_wp_slug(lower_path, "/wp-content/plugins/")
-            if theme:
-                wp_themes.add(theme)
-            if plugin:
-                wp_plugins.add(plugin)
-
-            category = self._extract_wp_slug(lower_path, "/category/")
-            tag = self._extract_wp_slug(lower_path, "/tag/")
-            if category:
-                wp_categories.add(unquote(category))
-            if tag:
-                wp_tags.add(unquote(tag))
-
-            route = self._extract_wp_json_route(lower_path)
-            if route:
-                wp_json_routes.add(route)
-                parts = route.split("/")
-                if len(parts) >= 3 and parts[0] == "wp" and parts[1] == "v2":
-                    wp_post_types.add(parts[2])
-
-            if re.search(r"/\d{4}/\d{2}/[^/]+/?$", lower_path):
-                wp_blog_posts.append(path)
+            agg.update(self, row)
 
         html = self._download_at_timestamp(normalized, chosen)
         if html and ("text/html" in html[1] or "application/xhtml" in html[1]):
             body = self._decode_text(html[0]).lower()
             if "wp-content" in body or "wordpress" in body:
-                signals.append("wordpress")
+                signals["wordpress"] += 1
             if "wix" in body or "wixstatic" in body:
-                signals.append("wix")
+                signals["wix"] += 1
             if "shopify" in body:
-                signals.append("shopify")
+                signals["shopify"] += 1
             if "<div id=\"root\"" in body or "__next" in body:
-                signals.append("spa")
+                signals["spa"] += 1
 
         kind = self._guess_site_type(signals)
-        top_mimes = sorted(mime_buckets.items(), key=lambda x: x[1], reverse=True)[:8]
-        top_exts = sorted(ext_buckets.items(), key=lambda x: x[1], reverse=True)[:8]
-        top_folders = sorted(folder_counts.items(), key=lambda x: x[1], reverse=True)[:25]
-        site_pages = sorted(set(page_candidates))[:200]
-        wp_blog_posts = sorted(set(wp_blog_posts))[:80]
+        total_size = agg.total_size
+        top_mimes = agg.mime.most_common(8)
+        top_exts = agg.ext.most_common(8)
+        top_folders = agg.folders.most_common(25)
+        site_pages = sorted(set(agg.pages))[:200]
+        wp_blog_posts = sorted(set(agg.wp_blog_posts))[:80]
 
         self._emit_progress(progress_callback, stage="done", message="Analysis complete", percent=100)
         return {
@@ -386,14 +558,14 @@ class ArchiveWebTool:
             "site_pages": site_pages,
             "variants_checked": merged["variants"],
             "wordpress": {
-                "detected": kind == "WordPress" or bool(wp_themes or wp_plugins or wp_json_routes),
-                "themes": sorted(wp_themes),
-                "plugins": sorted(wp_plugins),
-                "categories": sorted(wp_categories),
-                "tags": sorted(wp_tags),
-                "post_types": sorted(wp_post_types),
+                "detected": kind == "WordPress" or bool(agg.wp_themes or agg.wp_plugins or agg.wp_json_routes),
+                "themes": sorted(agg.wp_themes),
+                "plugins": sorted(agg.wp_plugins),
+                "categories": sorted(agg.wp_categories),
+                "tags": sorted(agg.wp_tags),
+                "post_types": sorted(agg.wp_post_types),
                 "blog_posts": wp_blog_posts,
-                "wp_json_routes": sorted(wp_json_routes)[:120],
+                "wp_json_routes": sorted(agg.wp_json_routes)[:120],
             },
         }
 
@@ -418,11 +590,11 @@ class ArchiveWebTool:
 
         host_slug = self._safe_name(urlparse(normalized).netloc)
         output_dir = self._resolve_output_dir(Path(output_root), host_slug, chosen)
-        manifest_path = output_dir / "manifest.json"
-        if not manifest_path.exists():
-            raise RuntimeError(f"Manifest not found: {manifest_path}")
+        manifest_path = self._find_manifest(output_dir)
+        if manifest_path is None:
+            raise RuntimeError(f"Manifest not found: {output_dir / MANIFEST_NAME}")
 
-        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest = self._read_manifest(manifest_path)
         files = manifest.get("files", [])
         downloaded_urls = {
             self._clean_url(item.get("url", ""))
@@ -430,10 +602,10 @@ class ArchiveWebTool:
             if isinstance(item, dict) and item.get("url")
         }
 
-        allowed_hosts = {urlparse(v["url"]).netloc for v in merged["variants"]}
+        allowed_hosts = frozenset(urlparse(v["url"]).netloc for v in merged["variants"])
         wildcards = [self._wildcard_url(v["url"]) for v in merged["variants"]]
         self._emit_progress(progress_callback, stage="prepare", message="Loading audit inventory", percent=10)
-        rows = self._collect_cdx_rows(
+        rows = self._iter_cdx_rows(
             wildcards,
             to_timestamp=chosen,
             limit=60000,
@@ -445,14 +617,15 @@ class ArchiveWebTool:
         expected_urls = {
             self._clean_url(row[1])
             for row in rows
-            if len(row) >= 5 and urlparse(row[1]).netloc in allowed_hosts
+            if len(row) >= 5 and _fast_netloc(row[1]) in allowed_hosts
         }
 
-        have_urls = sorted(downloaded_urls.intersection(expected_urls))
-        missing_urls = sorted(expected_urls.difference(downloaded_urls))
-        extra_urls = sorted(downloaded_urls.difference(expected_urls))
+        have_urls = downloaded_urls & expected_urls
+        missing_urls = expected_urls - downloaded_urls
+        extra_urls = downloaded_urls - expected_urls
         coverage = round((len(have_urls) / len(expected_urls)) * 100, 2) if expected_urls else 0.0
 
+        sizes = self._file_sizes(output_dir)
         downloaded_bytes = 0
         for idx, item in enumerate(files, start=1):
             if should_abort is not None and should_abort():
@@ -464,9 +637,12 @@ class ArchiveWebTool:
             local = item.get("local_path")
             if not local:
                 continue
-            full = output_dir / local
-            if full.exists() and full.is_file():
-                downloaded_bytes += full.stat().st_size
+            size = sizes.get(local)
+            if size is None:
+                full = output_dir / local
+                if full.is_file():
+                    size = full.stat().st_size
+            downloaded_bytes += size or 0
 
         self._emit_progress(progress_callback, stage="done", message="Check complete", percent=100)
         return {
@@ -481,9 +657,9 @@ class ArchiveWebTool:
             "coverage_percent": coverage,
             "downloaded_size_bytes": downloaded_bytes,
             "downloaded_size_human": self._human_size(downloaded_bytes),
-            "have_urls": have_urls[:300],
-            "missing_urls": missing_urls[:500],
-            "extra_urls": extra_urls[:200],
+            "have_urls": heapq.nsmallest(300, have_urls),
+            "missing_urls": heapq.nsmallest(500, missing_urls),
+            "extra_urls": heapq.nsmallest(200, extra_urls),
         }
 
     def download_missing(
@@ -531,11 +707,11 @@ class ArchiveWebTool:
 
         host_slug = self._safe_name(urlparse(normalized).netloc)
         output_dir = self._resolve_output_dir(Path(output_root), host_slug, chosen)
-        manifest_path = output_dir / "manifest.json"
-        if not manifest_path.exists():
-            raise RuntimeError(f"Manifest not found: {manifest_path}")
+        manifest_path = self._find_manifest(output_dir)
+        if manifest_path is None:
+            raise RuntimeError(f"Manifest not found: {output_dir / MANIFEST_NAME}")
 
-        payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+        payload = self._read_manifest(manifest_path)
         manifest_files = payload.get("files", []) if isinstance(payload, dict) else []
         if not isinstance(manifest_files, list):
             manifest_files = []
@@ -564,7 +740,7 @@ class ArchiveWebTool:
             missing_found=0,
         )
 
-        allowed_hosts = {urlparse(v["url"]).netloc for v in merged["variants"]}
+        allowed_hosts = frozenset(urlparse(v["url"]).netloc for v in merged["variants"])
         wildcards = [self._wildcard_url(v["url"]) for v in merged["variants"]]
 
         self._emit_progress(
@@ -586,11 +762,11 @@ class ArchiveWebTool:
             missing_found=0,
         )
 
-        rows = self._collect_cdx_rows(wildcards, to_timestamp=chosen, limit=70000)
+        rows = self._iter_cdx_rows(wildcards, to_timestamp=chosen, limit=70000)
         expected_urls = [
             self._clean_url(row[1])
             for row in rows
-            if len(row) >= 5 and urlparse(row[1]).netloc in allowed_hosts
+            if len(row) >= 5 and _fast_netloc(row[1]) in allowed_hosts
         ]
         missing_urls = [u for u in dict.fromkeys(expected_urls) if u not in existing_map]
         targets = missing_urls[: max(1, limit)]
@@ -619,72 +795,84 @@ class ArchiveWebTool:
             missing_found=len(missing_urls),
         )
 
-        for idx, url in enumerate(targets, start=1):
-            if wait_if_paused is not None:
-                wait_if_paused(url)
-            if should_abort is not None and should_abort():
-                raise RuntimeError("Stopped by user")
-            self._emit_progress(
-                progress_callback,
-                stage="download",
-                message="Downloading missing files",
-                percent=min(98, int((idx / max(len(targets), 1)) * 100)),
-                attempted=idx - 1,
-                total=len(targets),
-                added=added,
-                failed=failed,
-                bytes_added=bytes_added,
-                current_url=url,
-                phase_detail="Downloading and repairing file",
-                current_variant="",
-                variants_done=len(merged["variants"]),
-                variants_total=len(merged["variants"]),
-                total_expected=len(expected_urls),
-                missing_found=len(missing_urls),
-            )
-            try:
-                download = self._download_with_repair(url, chosen)
-                if not download:
+        pool = ThreadPoolExecutor(max_workers=self._download_workers, thread_name_prefix="missing-download")
+        pending: deque[Tuple[str, Future]] = deque()
+        queued = 0
+        done = 0
+        try:
+            while queued < len(targets) or pending:
+                while queued < len(targets) and len(pending) < self._download_workers:
+                    url = targets[queued]
+                    if wait_if_paused is not None:
+                        wait_if_paused(url)
+                    if should_abort is not None and should_abort():
+                        raise RuntimeError("Stopped by user")
+                    queued += 1
+                    self._emit_progress(
+                        progress_callback,
+                        stage="download",
+                        message="Downloading missing files",
+                        percent=min(98, int((queued / max(len(targets), 1)) * 100)),
+                        attempted=done,
+                        total=len(targets),
+                        added=added,
+                        failed=failed,
+                        bytes_added=bytes_added,
+                        current_url=url,
+                        phase_detail="Downloading and repairing file",
+                        current_variant="",
+                        variants_done=len(merged["variants"]),
+                        variants_total=len(merged["variants"]),
+                        total_expected=len(expected_urls),
+                        missing_found=len(missing_urls),
+                    )
+                    pending.append((url, pool.submit(self._download_and_save, output_dir, url, chosen)))
+
+                url, future = pending.popleft()
+                done += 1
+                try:
+                    saved = future.result()
+                    if not saved:
+                        failed += 1
+                        continue
+
+                    local_rel, mime, used_timestamp, size = saved
+                    existing_map[url] = {
+                        "url": url,
+                        "local_path": local_rel,
+                        "mime": mime,
+                        "timestamp": used_timestamp,
+                    }
+                    added += 1
+                    bytes_added += size
+                    if used_timestamp != chosen:
+                        recovered += 1
+                except Exception as exc:
                     failed += 1
+                    self._emit_progress(
+                        progress_callback,
+                        stage="download",
+                        message="Error on file, skipping to next",
+                        percent=min(98, int((done / max(len(targets), 1)) * 100)),
+                        attempted=done,
+                        total=len(targets),
+                        added=added,
+                        failed=failed,
+                        bytes_added=bytes_added,
+                        current_url=url,
+                        last_error=str(exc),
+                        phase_detail="File failed, skipped",
+                        current_variant="",
+                        variants_done=len(merged["variants"]),
+                        variants_total=len(merged["variants"]),
+                        total_expected=len(expected_urls),
+                        missing_found=len(missing_urls),
+                    )
+                    if not skip_errors:
+                        raise
                     continue
-
-                body, mime, used_timestamp = download
-                local_abs, local_rel = self._save_file(output_dir, url, body, mime)
-                _ = local_abs
-                existing_map[url] = {
-                    "url": url,
-                    "local_path": local_rel,
-                    "mime": mime,
-                    "timestamp": used_timestamp,
-                }
-                added += 1
-                bytes_added += len(body)
-                if used_timestamp != chosen:
-                    recovered += 1
-            except Exception as exc:
-                failed += 1
-                self._emit_progress(
-                    progress_callback,
-                    stage="download",
-                    message="Error on file, skipping to next",
-                    percent=min(98, int((idx / max(len(targets), 1)) * 100)),
-                    attempted=idx,
-                    total=len(targets),
-                    added=added,
-                    failed=failed,
-                    bytes_added=bytes_added,
-                    current_url=url,
-                    last_error=str(exc),
-                    phase_detail="File failed, skipped",
-                    current_variant="",
-                    variants_done=len(merged["variants"]),
-                    variants_total=len(merged["variants"]),
-                    total_expected=len(expected_urls),
-                    missing_found=len(missing_urls),
-                )
-                if not skip_errors:
-                    raise
-                continue
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
 
         payload["files"] = list(existing_map.values())
         payload["files_downloaded"] = len(payload["files"])
@@ -698,7 +886,7 @@ class ArchiveWebTool:
             "bytes_added": bytes_added,
             "seconds": round(time.time() - started, 2),
         }
-        manifest_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        self._store_manifest(manifest_path, payload)
 
         self._emit_progress(
             progress_callback,
@@ -731,20 +919,48 @@ class ArchiveWebTool:
             "seconds": round(time.time() - started, 2),
         }
 
+    def _download_and_save(self, output_dir: Path, url: str, latest_timestamp: str) -> Optional[Tuple[str, str, str, int]]:
+        download = self._download_with_repair(url, latest_timestamp)
+        if not download:
+            return None
+        body, mime, used_timestamp = download
+        _, local_rel = self._save_file(output_dir, url, body, mime)
+        return local_rel, mime, used_timestamp, len(body)
+
+    def _file_sizes(self, root: Path) -> Dict[str, int]:
+        sizes: Dict[str, int] = {}
+        stack = [("", str(root))]
+        while stack:
+            prefix, folder = stack.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        name = prefix + entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append((name + "/", entry.path))
+                            elif entry.is_file():
+                                sizes[name] = entry.stat().st_size
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return sizes
+
     def _resolve_output_dir(self, output_root: Path, host_slug: str, chosen: str) -> Path:
         direct = output_root / f"{host_slug}_{chosen}"
-        if (direct / "manifest.json").exists():
+        if self._find_manifest(direct) is not None:
             return direct
 
-        if (output_root / "manifest.json").exists():
+        if self._find_manifest(output_root) is not None:
             return output_root
 
         if output_root.name.startswith(f"{host_slug}_"):
             parent_candidate = output_root.parent / f"{host_slug}_{chosen}"
-            if (parent_candidate / "manifest.json").exists():
+            if self._find_manifest(parent_candidate) is not None:
                 return parent_candidate
 
-        matches = sorted(output_root.glob(f"{host_slug}_*/manifest.json"))
+        matches = self._glob_manifests(output_root, f"{host_slug}_*")
         if matches:
             exact = [m for m in matches if m.parent.name == f"{host_slug}_{chosen}"]
             if exact:
@@ -768,7 +984,7 @@ class ArchiveWebTool:
         snapshots = merged["ok"]
         if not snapshots:
             raise RuntimeError("No archived snapshots found for this URL")
-        allowed_hosts = {urlparse(v["url"]).netloc for v in merged["variants"]}
+        allowed_hosts = frozenset(urlparse(v["url"]).netloc for v in merged["variants"])
 
         latest = snapshots[-1]
         if preferred_snapshot and preferred_snapshot.isdigit() and len(preferred_snapshot) == 14:
@@ -779,7 +995,7 @@ class ArchiveWebTool:
         inventory_urls = [
             row[1]
             for row in inventory_rows
-            if len(row) >= 5 and urlparse(row[1]).netloc in allowed_hosts
+            if len(row) >= 5 and _fast_netloc(row[1]) in allowed_hosts
         ]
         prioritized_inventory = self._prioritize_inventory_urls(inventory_rows, allowed_hosts)
         inventory_size = sum(int(r[3]) for r in inventory_rows if len(r) >= 4 and str(r[3]).isdigit())
@@ -969,8 +1185,54 @@ class ArchiveWebTool:
                 for f in result.files
             ],
         }
-        manifest_path = output_dir / "manifest.json"
-        manifest_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        self._store_manifest(output_dir / MANIFEST_NAME, payload)
+
+    def _find_manifest(self, directory: Path) -> Optional[Path]:
+        for name in MANIFEST_NAMES:
+            candidate = directory / name
+            if candidate.exists():
+                return candidate
+        return None
+
+    def _glob_manifests(self, root: Path, folder_pattern: str) -> List[Path]:
+        return sorted(p for p in root.glob(f"{folder_pattern}/{MANIFEST_NAME}*") if p.name in MANIFEST_NAMES)
+
+    def _read_manifest(self, manifest_path: Path) -> object:
+        return _load_manifest_bytes(manifest_path.read_bytes())
+
+    def _store_manifest(self, manifest_path: Path, payload: Dict[str, object]) -> None:
+        stale_path = manifest_path.with_name(MANIFEST_NAME if self._manifest_gzip else MANIFEST_GZIP_NAME)
+        manifest_path = manifest_path.with_name(MANIFEST_GZIP_NAME if self._manifest_gzip else MANIFEST_NAME)
+        data = _dump_manifest_bytes(payload)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        key = str(manifest_path)
+        try:
+            stat = manifest_path.stat()
+            if self._manifest_digests.get(key) == (digest, stat.st_size, stat.st_mtime_ns):
+                return
+        except OSError:
+            pass
+
+        if self._manifest_gzip:
+            data = gzip.compress(data, compresslevel=1, mtime=0)
+        tmp_name = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_name, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, manifest_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        stat = manifest_path.stat()
+        self._manifest_digests[key] = (digest, stat.st_size, stat.st_mtime_ns)
+        try:
+            stale_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._manifest_digests.pop(str(stale_path), None)
 
     def _list_snapshots(
         self,
@@ -1021,7 +1283,29 @@ class ArchiveWebTool:
         progress_callback: Optional[Callable[[Dict[str, object]], None]] = None,
         progress_stage: str = "inventory",
     ) -> List[List[str]]:
-        dedup: Dict[str, List[str]] = {}
+        return list(
+            self._iter_cdx_rows(
+                wildcard_urls,
+                to_timestamp,
+                limit=limit,
+                wait_if_paused=wait_if_paused,
+                should_abort=should_abort,
+                progress_callback=progress_callback,
+                progress_stage=progress_stage,
+            )
+        )
+
+    def _iter_cdx_rows(
+        self,
+        wildcard_urls: List[str],
+        to_timestamp: str,
+        limit: int = 30000,
+        wait_if_paused: Optional[Callable[[str], None]] = None,
+        should_abort: Optional[Callable[[], bool]] = None,
+        progress_callback: Optional[Callable[[Dict[str, object]], None]] = None,
+        progress_stage: str = "inventory",
+    ) -> Iterator[List[str]]:
+        seen: set[str] = set()
         per_variant_limit = max(300, int(limit / max(len(wildcard_urls), 1)))
 
         for idx, wildcard in enumerate(wildcard_urls, start=1):
@@ -1047,36 +1331,39 @@ class ArchiveWebTool:
                 "to": to_timestamp,
                 "limit": str(per_variant_limit),
             }
-            try:
-                response = self._get_with_backoff(
-                    CDX_API,
-                    params=params,
-                    timeout=(10, self.timeout),
-                    retries=2,
-                )
-                rows = response.json()
-            except requests.RequestException:
-                continue
+            rows = self._cdx_rows_get(wildcard, to_timestamp, per_variant_limit)
+            if rows is None:
+                try:
+                    response = self._get_with_backoff(
+                        CDX_API,
+                        params=params,
+                        timeout=(10, self.timeout),
+                        retries=2,
+                    )
+                    rows = response.json()
+                except requests.RequestException:
+                    continue
+                self._cdx_rows_set(wildcard, to_timestamp, per_variant_limit, rows)
 
-            for row in rows[1:] if len(rows) > 1 else []:
+            for row in islice(rows, 1, None):
                 if len(row) < 5:
                     continue
                 key = f"{row[1]}|{row[4]}"
-                if key not in dedup:
-                    dedup[key] = row
+                if key not in seen:
+                    seen.add(key)
+                    yield row
+            del rows
             self._emit_progress(
                 progress_callback,
                 stage=progress_stage,
                 message="Archive index chunk complete",
                 percent=min(24, 8 + int((idx / max(len(wildcard_urls), 1)) * 14)),
-                found=len(dedup),
+                found=len(seen),
                 variant=wildcard,
                 variants_done=idx,
                 variants_total=len(wildcard_urls),
             )
 
-        return list(dedup.values())
-
     def _merge_variant_snapshots(
         self,
         normalized_url: str,
@@ -1103,66 +1390,65 @@ class ArchiveWebTool:
             total_ok=0,
         )
 
-        for idx, variant in enumerate(variants, start=1):
-            if should_abort is not None and should_abort():
-                raise RuntimeError("Stopped by user")
-            if wait_if_paused is not None:
-                wait_if_paused(variant)
-            self._emit_progress(
-                progress_callback,
-                stage="variant",
-                message="Checking capture list for variant",
-                percent=min(95, int((idx / max(len(variants), 1)) * 100) - 5),
-                variants_done=idx - 1,
-                variants_total=len(variants),
-                current_variant=variant,
-                total_captures=len(all_ts),
-                total_ok=len(ok_ts),
-            )
-            variant_error = False
-            try:
-                all_list = self._list_snapshots_adaptive(
-                    variant,
-                    success_only=False,
-                    max_rows=max(500, cdx_limit),
+        if wait_if_paused is not None:
+            wait_if_paused(normalized_url)
+        if should_abort is not None and should_abort():
+            raise RuntimeError("Stopped by user")
+        window = max(1, min(CDX_VARIANT_WINDOW, len(variants)))
+        pool = ThreadPoolExecutor(max_workers=window, thread_name_prefix="cdx-variant")
+        pending: deque[Tuple[str, Future]] = deque()
+        queued = 0
+        done = 0
+        try:
+            while queued < len(variants) or pending:
+                while queued < len(variants) and len(pending) < window:
+                    variant = variants[queued]
+                    if should_abort is not None and should_abort():
+                        raise RuntimeError("Stopped by user")
+                    if wait_if_paused is not None:
+                        wait_if_paused(variant)
+                    queued += 1
+                    self._emit_progress(
+                        progress_callback,
+                        stage="variant",
+                        message="Checking capture list for variant",
+                        percent=min(95, int((queued / max(len(variants), 1)) * 100) - 5),
+                        variants_done=done,
+                        variants_total=len(variants),
+                        current_variant=variant,
+                        total_captures=len(all_ts),
+                        total_ok=len(ok_ts),
+                    )
+                    pending.append((variant, pool.submit(self._fetch_variant_snapshots, variant, max(500, cdx_limit))))
+
+                variant, future = pending.popleft()
+                all_list, ok_list, variant_error = future.result()
+                done += 1
+                if variant_error:
+                    failed_variants += 1
+                all_ts.update(all_list)
+                ok_ts.update(ok_list)
+                variant_rows.append(
+                    {
+                        "url": variant,
+                        "captures": len(all_list),
+                        "ok_captures": len(ok_list),
+                    }
                 )
-            except RuntimeError:
-                all_list = []
-                variant_error = True
 
-            try:
-                ok_list = self._list_snapshots_adaptive(
-                    variant,
-                    success_only=True,
-                    max_rows=max(500, cdx_limit),
+                self._emit_progress(
+                    progress_callback,
+                    stage="variant",
+                    message="Variant checked",
+                    percent=min(96, int((done / max(len(variants), 1)) * 100)),
+                    variants_done=done,
+                    variants_total=len(variants),
+                    current_variant=variant,
+                    total_captures=len(all_ts),
+                    total_ok=len(ok_ts),
                 )
-            except RuntimeError:
-                ok_list = []
-                variant_error = True
-
-            if variant_error:
-                failed_variants += 1
-            all_ts.update(all_list)
-            ok_ts.update(ok_list)
-            variant_rows.append(
-                {
-                    "url": variant,
-                    "captures": len(all_list),
-                    "ok_captures": len(ok_list),
-                }
-            )
-
-            self._emit_progress(
-                progress_callback,
-                stage="variant",
-                message="Variant checked",
-                percent=min(96, int((idx / max(len(variants), 1)) * 100)),
-                variants_done=idx,
-                variants_total=len(variants),
-                current_variant=variant,
-                total_captures=len(all_ts),
-                total_ok=len(ok_ts),
-            )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
 
         self._emit_progress(
             progress_callback,
@@ -1184,6 +1470,21 @@ class ArchiveWebTool:
             "variant_count": len(variants),
         }
 
+    def _fetch_variant_snapshots(self, variant: str, max_rows: int) -> Tuple[List[str], List[str], bool]:
+        variant_error = False
+        try:
+            all_list = self._list_snapshots_adaptive(variant, success_only=False, max_rows=max_rows)
+        except RuntimeError:
+            all_list = []
+            variant_error = True
+
+        try:
+            ok_list = self._list_snapshots_adaptive(variant, success_only=True, max_rows=max_rows)
+        except RuntimeError:
+            ok_list = []
+            variant_error = True
+        return all_list, ok_list, variant_error
+
     def _list_snapshots_adaptive(self, target_url: str, success_only: bool, max_rows: int) -> List[str]:
         attempts = [max_rows, max(800, max_rows // 2), 800, 500]
         last_error: Optional[Exception] = None
@@ -1299,6 +1600,10 @@ class ArchiveWebTool:
         return timestamps
 
     def _download_at_timestamp(self, url: str, timestamp: str) -> Optional[Tuple[bytes, str, str]]:
+        cached = self._page_cache_get(url, timestamp)
+        if cached is not None:
+            return cached[0], cached[1], timestamp
+
         archive_url = WAYBACK_RAW.format(timestamp=timestamp, url=url)
         try:
             response = self._get_with_backoff(
@@ -1314,6 +1619,8 @@ class ArchiveWebTool:
         if not body:
             return None
         mime = response.headers.get("content-type", "application/octet-stream").split(";")[0].strip().lower()
+        if "text/html" in mime or "application/xhtml" in mime:
+            self._page_cache_set(url, timestamp, body, mime)
         return body, mime, timestamp
 
     def _discover_links(self, base_url: str, body: bytes, mime: str) -> List[str]:
@@ -1452,7 +1759,7 @@ class ArchiveWebTool:
 
         if parsed.query:
             stem, ext = os.path.splitext(parts[-1])
-            query_hash = hashlib.sha1(parsed.query.encode("utf-8")).hexdigest()[:8]
+            query_hash = hashlib.sha1(parsed.query.encode("utf-8"), usedforsecurity=False).hexdigest()[:8]
             parts[-1] = f"{stem}__q_{query_hash}{ext}"
 
         if len(parts) > 1:
@@ -1460,9 +1767,7 @@ class ArchiveWebTool:
         return parts[0]
 
     def _safe_name(self, text: str) -> str:
-        value = SAFE_NAME_RE.sub("_", text.strip())
-        value = value.strip("._")
-        return value or "file"
+        return _cached_safe_name(text)
 
     def _resolve_url(self, base_url: str, value: str) -> Optional[str]:
         candidate = value.strip()
@@ -1479,8 +1784,7 @@ class ArchiveWebTool:
         return self._clean_url(resolved)
 
     def _clean_url(self, url: str) -> str:
-        parsed = urlparse(url)
-        return urlunparse((parsed.scheme, parsed.netloc, parsed.path, "", parsed.query, ""))
+        return _cached_clean_url(url)
 
     def _normalize_target(self, target_url: str) -> str:
         url = target_url.strip()
@@ -1496,32 +1800,18 @@ class ArchiveWebTool:
     def _is_same_host(self, root_url: str, other_url: str) -> bool:
         return urlparse(root_url).netloc == urlparse(other_url).netloc
 
-    def _is_allowed_host(self, allowed_hosts: set[str], other_url: str) -> bool:
-        return urlparse(other_url).netloc in allowed_hosts
+    def _is_allowed_host(self, allowed_hosts: frozenset[str], other_url: str) -> bool:
+        return _fast_netloc(other_url) in allowed_hosts
 
     def _wildcard_url(self, root_url: str) -> str:
         parsed = urlparse(root_url)
         return f"{parsed.scheme}://{parsed.netloc}/*"
 
     def _extension_of_url(self, value: str) -> str:
-        path = urlparse(value).path
-        base = path.rsplit("/", 1)[-1]
-        if "." not in base:
-            return "(none)"
-        ext = base.rsplit(".", 1)[-1].lower()
-        if not ext or len(ext) > 8:
-            return "(none)"
-        return "." + ext
+        return _cached_extension_of_url(value)
 
     def _folder_of_path(self, path: str) -> str:
-        clean = path if path else "/"
-        if clean == "/":
-            return "/"
-        if clean.endswith("/"):
-            return clean
-        if "/" not in clean[1:]:
-            return "/"
-        return clean.rsplit("/", 1)[0] + "/"
+        return _cached_folder_of_path(path)
 
     def _looks_like_page(self, path: str, mime: str) -> bool:
         lower = path.lower()
@@ -1533,13 +1823,13 @@ class ArchiveWebTool:
             return True
         return lower.endswith("/")
 
-    def _prioritize_inventory_urls(self, rows: List[List[str]], allowed_hosts: set[str]) -> List[str]:
+    def _prioritize_inventory_urls(self, rows: List[List[str]], allowed_hosts: frozenset[str]) -> List[str]:
         scored: List[Tuple[int, str]] = []
         for row in rows:
             if len(row) < 5:
                 continue
             url = row[1]
-            if urlparse(url).netloc not in allowed_hosts:
+            if _fast_netloc(url) not in allowed_hosts:
                 continue
             mime = (row[2] or "").lower()
             path = urlparse(url).path or "/"
@@ -1579,7 +1869,7 @@ class ArchiveWebTool:
             return ""
         return tail
 
-    def _guess_site_type(self, signals: List[str]) -> str:
+    def _guess_site_type(self, signals: Counter[str]) -> str:
         if not signals:
             return "Static/Unknown"
 
@@ -1590,11 +1880,7 @@ class ArchiveWebTool:
             "php": "PHP site",
             "spa": "SPA/React-like",
         }
-        counts: Dict[str, int] = {}
-        for item in signals:
-            counts[item] = counts.get(item, 0) + 1
-
-        best = sorted(counts.items(), key=lambda x: x[1], reverse=True)[0][0]
+        best = signals.most_common(1)[0][0]
         return rank.get(best, "Static/Unknown")
 
     def _human_size(self, size: int) -> str:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import time
 import unittest
 from dataclasses import asdict
@@ -127,6 +128,25 @@ class AsyncRoutesSmokeTest(unittest.TestCase):
             seconds=0.2,
         )
 
+    def test_status_poll_returns_304_until_job_changes(self) -> None:
+        with patch.object(web_app.tool, "inspect", side_effect=self._fake_inspect):
+            started = self.client.post(
+                "/inspect/start",
+                data={"target_url": self.target_url, "display_limit": "10", "cdx_limit": "1500", "force_refresh": "1"},
+            ).get_json()
+            path = f"/inspect/status/{started['job_id']}"
+            self._poll_status(path)
+            first = self.client.get(path)
+            etag = first.headers.get("ETag")
+            self.assertTrue(etag)
+            again = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.data, b"")
+            web_app.INSPECT_JOBS.update(started["job_id"], error=None)
+            changed = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed.headers.get("ETag"), etag)
+
     def test_async_routes_start_and_reach_terminal_state(self) -> None:
         with patch.object(web_app.tool, "inspect", side_effect=self._fake_inspect), patch.object(
             web_app.tool, "analyze", side_effect=self._fake_analyze
@@ -203,6 +223,15 @@ class AsyncRoutesSmokeTest(unittest.TestCase):
             self._assert_progress_shape(download_done)
             self.assertIn("result", download_done)
             self.assertEqual(download_done["result"].get("files_downloaded"), asdict(self._fake_run()).get("files_downloaded"))
+            self.assertEqual(download_done["result"].get("rel_output"), "output/fake")
+            events = self.client.get(f"/download/events/{download_start['job_id']}")
+            self.assertEqual(events.mimetype, "text/event-stream")
+            self.assertTrue(events.data.startswith(b"data: "))
+            self.assertEqual(json.loads(events.data[len(b"data: "):]).get("state"), "done")
+            result_page = self.client.get(f"/download/result/{download_start['job_id']}")
+            self.assertEqual(result_page.status_code, 200)
+            self.assertIn(b"Download Result", result_page.data)
+            self.assertIn(b"Output folder: output/fake", result_page.data)
 
             missing_start = self.client.post(
                 "/download-missing/start",
@@ -14,17 +14,71 @@ try:
 except Exception:  # pragma: no cover
     pymysql = None
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+
+def _dump_json(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+
+def _load_json(text: Any) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
 
 class SQLiteStore:
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA mmap_size=268435456",
+    )
+
     def __init__(self, db_path: Path) -> None:
         self.db_path = db_path
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._local = threading.local()
         self._init_db()
 
     @contextmanager
     def _connect(self):
+        active = getattr(self._local, "conn", None)
+        if active is not None:
+            yield active
+            return
+        with self._open_connection() as conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, "conn", None) is not None:
+            yield
+            return
+        with self._lock, self._open_connection() as conn:
+            self._local.conn = conn
+            try:
+                yield
+            finally:
+                self._local.conn = None
+
+    @contextmanager
+    def _open_connection(self):
         conn = sqlite3.connect(str(self.db_path), timeout=30)
         conn.row_factory = sqlite3.Row
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         try:
             yield conn
             conn.commit()
@@ -38,7 +92,6 @@ class SQLiteStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         with self._connect() as conn:
             conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS projects (
@@ -137,7 +190,7 @@ class SQLiteStore:
         if not row:
             return default
         try:
-            return json.loads(row["value_json"])
+            return _load_json(row["value_json"])
         except json.JSONDecodeError:
             return default
 
@@ -148,14 +201,14 @@ class SQLiteStore:
         for row in rows:
             key = str(row["key"])
             try:
-                out[key] = json.loads(row["value_json"])
+                out[key] = _load_json(row["value_json"])
             except json.JSONDecodeError:
                 continue
         return out
 
     def upsert_setting(self, key: str, value: Any) -> None:
         now = int(time.time())
-        value_json = json.dumps(value)
+        value_json = _dump_json(value)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -221,7 +274,7 @@ class SQLiteStore:
     ) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -254,7 +307,7 @@ class SQLiteStore:
     ) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -331,6 +384,37 @@ class SQLiteStore:
                 ).fetchone()
         return self._decode_cache_row(row, max_age_seconds)
 
+    def get_latest_analyze_for_snapshots(
+        self,
+        target_url: str,
+        snapshots: List[str],
+        max_age_seconds: int,
+    ) -> Dict[str, Dict[str, Any]]:
+        target_url = self._normalize_target_url(target_url)
+        wanted = [snapshot for snapshot in dict.fromkeys(snapshots) if snapshot]
+        if not wanted:
+            return {}
+        placeholders = ",".join("?" for _ in wanted)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT snapshot, cache_key, payload_json, created_at
+                FROM analyze_cache
+                WHERE target_url = ? AND snapshot IN ({placeholders})
+                ORDER BY created_at DESC
+                """,
+                (target_url, *wanted),
+            ).fetchall()
+        out: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            snapshot = row["snapshot"]
+            if snapshot in out:
+                continue
+            decoded = self._decode_cache_row(row, max_age_seconds)
+            if decoded is not None:
+                out[snapshot] = decoded
+        return out
+
     def get_latest_sitemap_for_url(
         self,
         target_url: str,
@@ -398,7 +482,7 @@ class SQLiteStore:
     def set_sitemap_cache(self, cache_key: str, target_url: str, snapshot: str, payload: Dict[str, Any]) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -416,7 +500,7 @@ class SQLiteStore:
     def set_check_cache(self, cache_key: str, target_url: str, snapshot: str, payload: Dict[str, Any]) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -573,7 +657,7 @@ class SQLiteStore:
         for row in rows:
             item = dict(row)
             try:
-                item["summary"] = json.loads(item.get("summary_json") or "{}")
+                item["summary"] = _load_json(item.get("summary_json") or "{}")
             except json.JSONDecodeError:
                 item["summary"] = {}
             created_at = int(item.get("created_at") or 0)
@@ -602,7 +686,7 @@ class SQLiteStore:
                     target_url,
                     snapshot,
                     state,
-                    json.dumps(summary or {}),
+                    _dump_json(summary or {}),
                     int(time.time()),
                 ),
             )
@@ -696,7 +780,7 @@ class SQLiteStore:
         if inspect_row is not None:
             inspect_created_at = int(inspect_row["created_at"] or 0)
             try:
-                inspect_payload = json.loads(inspect_row["payload_json"] or "{}")
+                inspect_payload = _load_json(inspect_row["payload_json"] or "{}")
             except json.JSONDecodeError:
                 inspect_payload = {}
 
@@ -787,7 +871,7 @@ class SQLiteStore:
         if age_seconds > max_age_seconds:
             return None
         try:
-            payload = json.loads(row["payload_json"])
+            payload = _load_json(row["payload_json"])
             return {
                 "cache_key": row["cache_key"],
                 "payload": payload,
@@ -835,11 +919,12 @@ class MySQLStore(SQLiteStore):
         self.password = password
         self.database = database
         self.db_path = Path("mysql")
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._local = threading.local()
         self._init_db()
 
     @contextmanager
-    def _connect(self):
+    def _open_connection(self):
         conn = pymysql.connect(
             host=self.host,
             port=self.port,
@@ -961,7 +1046,7 @@ class MySQLStore(SQLiteStore):
 
     def upsert_setting(self, key: str, value: Any) -> None:
         now = int(time.time())
-        value_json = json.dumps(value)
+        value_json = _dump_json(value)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -984,7 +1069,7 @@ class MySQLStore(SQLiteStore):
     ) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -1010,7 +1095,7 @@ class MySQLStore(SQLiteStore):
     ) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -1029,7 +1114,7 @@ class MySQLStore(SQLiteStore):
     def set_sitemap_cache(self, cache_key: str, target_url: str, snapshot: str, payload: Dict[str, Any]) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -1047,7 +1132,7 @@ class MySQLStore(SQLiteStore):
     def set_check_cache(self, cache_key: str, target_url: str, snapshot: str, payload: Dict[str, Any]) -> None:
         target_url = self._normalize_target_url(target_url)
         now = int(time.time())
-        data = json.dumps(payload)
+        data = _dump_json(payload)
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
+import archiver
 from app import app
 
 
@@ -30,6 +34,14 @@ class AppSmokeTest(unittest.TestCase):
                 response = self.client.post(route, data={})
                 self.assertEqual(response.status_code, 400)
 
+    def test_download_form_error_matches_accept_header(self) -> None:
+        response = self.client.post("/download", data={}, headers={"Accept": "application/json"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"ok": False, "error": "URL is required"})
+        response = self.client.post("/download", data={}, headers={"Accept": "text/html"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b"URL is required", response.data)
+
     def test_status_routes_reject_unknown_job(self) -> None:
         status_routes = [
             "/inspect/status/does-not-exist",
@@ -147,5 +159,116 @@ class AppSmokeTest(unittest.TestCase):
         self.assertIn("manifest_found", payload)
 
 
+class CdxRowsCacheSmokeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tool = archiver.ArchiveWebTool()
+        self.calls: list[int] = []
+        self.available = 2000
+
+    def _fake_get(self, _url, *, params=None, **_kwargs):
+        limit = int((params or {}).get("limit", "0"))
+        self.calls.append(limit)
+        count = min(limit, self.available)
+        rows = [["timestamp", "original", "mimetype", "length", "urlkey"]]
+        rows.extend(["20240101000000", f"https://example.com/{i}", "text/html", "10", f"key{i}"] for i in range(count))
+
+        class _Response:
+            def json(self):
+                return rows
+
+        return _Response()
+
+    def _rows(self, limit: int) -> list:
+        with patch.object(self.tool, "_get_with_backoff", side_effect=self._fake_get):
+            return list(self.tool._iter_cdx_rows(["example.com/*"], "20240101000000", limit=limit))
+
+    def test_larger_cached_limit_is_sliced(self) -> None:
+        self.assertEqual(len(self._rows(1000)), 1000)
+        rows = self._rows(500)
+        self.assertEqual(self.calls, [1000])
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(rows[-1][1], "https://example.com/499")
+
+    def test_truncated_smaller_limit_is_refetched(self) -> None:
+        self.assertEqual(len(self._rows(300)), 300)
+        self.assertEqual(len(self._rows(1000)), 1000)
+        self.assertEqual(self.calls, [300, 1000])
+
+    def test_short_smaller_limit_is_reused(self) -> None:
+        self.available = 100
+        self._rows(300)
+        self.assertEqual(len(self._rows(1000)), 100)
+        self.assertEqual(self.calls, [300])
+
+    def test_response_over_row_budget_is_not_cached(self) -> None:
+        self.tool._cdx_rows_cache_max_rows = 500
+        self._rows(1000)
+        self.assertEqual(self.tool._cdx_rows_cache_rows, 0)
+        self._rows(300)
+        self.assertEqual(self.tool._cdx_rows_cache_rows, 301)
+        self._rows(300)
+        self.assertEqual(self.calls, [1000, 300])
+
+    def test_expired_entry_is_evicted(self) -> None:
+        self._rows(300)
+        key = ("example.com/*", "20240101000000")
+        stored_at, limit, rows = self.tool._cdx_rows_cache[key]
+        self.tool._cdx_rows_cache[key] = (stored_at - archiver.CDX_ROWS_CACHE_SECONDS - 1, limit, rows)
+        self.assertIsNone(self.tool._cdx_rows_get(key[0], key[1], 300))
+        self.assertNotIn(key, self.tool._cdx_rows_cache)
+        self.assertEqual(self.tool._cdx_rows_cache_rows, 0)
+        self._rows(300)
+        self.assertEqual(self.calls, [300, 300])
+
+
+class ManifestGzipSmokeTest(unittest.TestCase):
+    def test_gzip_manifest_replaces_plain_and_is_found(self) -> None:
+        tool = archiver.ArchiveWebTool()
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            project = root / "example.com_20240101000000"
+            project.mkdir()
+            tool._store_manifest(project / archiver.MANIFEST_NAME, {"files": []})
+            self.assertTrue((project / archiver.MANIFEST_NAME).exists())
+
+            tool._manifest_gzip = True
+            payload = {"files": [{"url": "https://example.com/", "local_path": "index.html"}]}
+            tool._store_manifest(project / archiver.MANIFEST_NAME, payload)
+            gz_path = project / archiver.MANIFEST_GZIP_NAME
+            self.assertTrue(gz_path.exists())
+            self.assertFalse((project / archiver.MANIFEST_NAME).exists())
+
+            self.assertEqual(tool._find_manifest(project), gz_path)
+            self.assertEqual(tool._read_manifest(gz_path), payload)
+            self.assertEqual(tool._glob_manifests(root, "example.com_*"), [gz_path])
+            self.assertEqual(tool._glob_manifests(root, "**"), [gz_path])
+            self.assertEqual(tool._resolve_output_dir(root, "example.com", "20240101000000"), project)
+
+            tool._manifest_gzip = False
+            tool._store_manifest(gz_path, payload)
+            self.assertFalse(gz_path.exists())
+            self.assertEqual(tool._read_manifest(project / archiver.MANIFEST_NAME), payload)
+
+
+class VariantMergeSmokeTest(unittest.TestCase):
+    def test_stop_skips_unsubmitted_variant_queries(self) -> None:
+        tool = archiver.ArchiveWebTool()
+        fetched: list[str] = []
+
+        def _fake_fetch(variant, _max_rows):
+            fetched.append(variant)
+            return (["20240101000000"], ["20240101000000"], False)
+
+        with patch.object(tool, "_fetch_variant_snapshots", side_effect=_fake_fetch):
+            merged = tool._merge_variant_snapshots("https://example.com/")
+            self.assertEqual(len(fetched), len(merged["variants"]))
+            self.assertEqual([row["url"] for row in merged["variants"]], fetched)
+
+            fetched.clear()
+            with self.assertRaises(RuntimeError):
+                tool._merge_variant_snapshots("https://example.com/", should_abort=lambda: bool(fetched))
+            self.assertLessEqual(len(fetched), archiver.CDX_VARIANT_WINDOW)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -272,8 +272,13 @@
   const downloadStopBtn = document.getElementById("download-stop-btn");
   let downloadJobId = "";
   let downloadTimer = null;
+  let downloadEvents = null;
   function setDownloadButtons(state) { const active = !!downloadJobId; if (!downloadPauseBtn || !downloadResumeBtn || !downloadStopBtn) return; downloadPauseBtn.disabled = !active || state === "paused" || state === "done" || state === "error"; downloadResumeBtn.disabled = !active || state !== "paused"; downloadStopBtn.disabled = !active || state === "done" || state === "error" || state === "stopping"; }
-  if (downloadFormSimple) downloadFormSimple.addEventListener("submit", async function (ev) { ev.preventDefault(); addLog("Starting download from analyzed snapshot", "warning"); if (downloadLive) downloadLive.style.display = "block"; const d = await readApiResult(await fetch("/download/start", { method: "POST", body: new FormData(downloadFormSimple) }), "Download start failed"); downloadJobId = d.job_id; setDownloadButtons("running"); downloadTimer = setInterval(async function () { try { const s = await (await fetch("/download/status/" + downloadJobId)).json(); if (!s.ok) throw new Error(s.error || "status failed"); const p = s.progress || {}; const pct = Math.max(0, Math.min(100, Number(p.percent || 0))); if (downloadLiveBar) downloadLiveBar.style.width = pct + "%"; if (downloadLivePct) downloadLivePct.textContent = pct + "%"; if (downloadLiveText) downloadLiveText.textContent = p.message || "Downloading..."; if (downloadLiveDetail) downloadLiveDetail.textContent = detailFromProgress(p, [`${p.files_downloaded || 0}/${p.max_files || 0} files`, `queue ${p.queue_size || 0}`]); setDownloadButtons(s.state || "running"); if (s.state === "done") { clearInterval(downloadTimer); downloadTimer = null; addLog("Download finished", "success"); window.location.reload(); } if (s.state === "error") { clearInterval(downloadTimer); downloadTimer = null; addLog("Download error: " + (s.error || "unknown"), "error"); } } catch (e) { clearInterval(downloadTimer); downloadTimer = null; addLog("Download status error: " + e.message, "error"); } }, 1200); });
+  function stopDownloadUpdates() { if (downloadTimer) { clearInterval(downloadTimer); downloadTimer = null; } if (downloadEvents) { downloadEvents.close(); downloadEvents = null; } }
+  function showDownloadStatus(s) { if (!s.ok) throw new Error(s.error || "status failed"); const p = s.progress || {}; const pct = Math.max(0, Math.min(100, Number(p.percent || 0))); if (downloadLiveBar) downloadLiveBar.style.width = pct + "%"; if (downloadLivePct) downloadLivePct.textContent = pct + "%"; if (downloadLiveText) downloadLiveText.textContent = p.message || "Downloading..."; if (downloadLiveDetail) downloadLiveDetail.textContent = detailFromProgress(p, [`${p.files_downloaded || 0}/${p.max_files || 0} files`, `queue ${p.queue_size || 0}`]); setDownloadButtons(s.state || "running"); if (s.state === "done") { stopDownloadUpdates(); addLog("Download finished", "success"); window.location.href = "/download/result/" + encodeURIComponent(downloadJobId); } if (s.state === "error") { stopDownloadUpdates(); addLog("Download error: " + (s.error || "unknown"), "error"); } }
+  async function checkDownloadStatus() { try { showDownloadStatus(await (await fetch("/download/status/" + downloadJobId)).json()); } catch (e) { stopDownloadUpdates(); addLog("Download status error: " + e.message, "error"); } }
+  function pollDownload(jobId) { downloadJobId = jobId; if (downloadLive) downloadLive.style.display = "block"; setDownloadButtons("running"); stopDownloadUpdates(); if (!window.EventSource) { downloadTimer = setInterval(checkDownloadStatus, 1200); return; } downloadEvents = new EventSource("/download/events/" + encodeURIComponent(jobId)); downloadEvents.onmessage = function (ev) { try { showDownloadStatus(JSON.parse(ev.data)); } catch (e) { stopDownloadUpdates(); addLog("Download status error: " + e.message, "error"); } }; downloadEvents.onerror = function () { if (!downloadEvents) return; downloadEvents.close(); downloadEvents = null; downloadTimer = setInterval(checkDownloadStatus, 1200); }; }
+  if (downloadFormSimple) downloadFormSimple.addEventListener("submit", async function (ev) { ev.preventDefault(); addLog("Starting download from analyzed snapshot", "warning"); if (downloadLive) downloadLive.style.display = "block"; const d = await readApiResult(await fetch("/download/start", { method: "POST", body: new FormData(downloadFormSimple) }), "Download start failed"); pollDownload(d.job_id); });
   if (downloadPauseBtn) downloadPauseBtn.addEventListener("click", async function () { if (!downloadJobId) return; const d = await (await fetch("/download/pause/" + downloadJobId, { method: "POST" })).json(); if (d.ok) { addLog("Download paused", "warning"); setDownloadButtons("paused"); } });
   if (downloadResumeBtn) downloadResumeBtn.addEventListener("click", async function () { if (!downloadJobId) return; const d = await (await fetch("/download/resume/" + downloadJobId, { method: "POST" })).json(); if (d.ok) { addLog("Download resumed", "info"); setDownloadButtons("running"); } });
   if (downloadStopBtn) downloadStopBtn.addEventListener("click", async function () { if (!downloadJobId) return; const d = await (await fetch("/download/stop/" + downloadJobId, { method: "POST" })).json(); if (d.ok) { addLog("Download stopping requested", "warning"); setDownloadButtons("stopping"); } });
@@ -301,4 +306,5 @@
   if (context.hasSitemap) { const el = document.querySelector('[data-step="3"]'); if (el) el.classList.add("completed"); addLog("Sitemap generated", "success"); }
   if (context.hasCheck) { const el = document.querySelector('[data-step="4"]'); if (el) el.classList.add("completed"); addLog("Downloaded files check completed", "success"); }
   if (context.hasResult) { const el = document.querySelector('[data-step="5"]'); if (el) el.classList.add("completed"); addLog(`Download complete: ${context.resultFiles || 0} files`, "success"); }
+  if (context.downloadJobId) { addLog("Download running in background", "warning"); pollDownload(context.downloadJobId); }
 })();